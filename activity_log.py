@@ -0,0 +1,110 @@
+"""
+Activity Log for Enhanced Writeup Automation AI Tool
+Bounded per-session log with sequence numbers and on-disk overflow
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from itertools import islice
+from logging.handlers import RotatingFileHandler
+
+
+class ActivityLog:
+    """Ring buffer of log entries numbered with a monotonically increasing ``seq``.
+
+    Once ``capacity`` entries are held, each append pushes the oldest entry
+    out to ``overflow`` (a callable taking the entry), if one is given.
+    Entries numbered elsewhere (by a shared session store) come in through
+    ``add`` instead, and their overflow is the numbering side's business.
+    """
+
+    def __init__(self, capacity=500, overflow=None):
+        self.capacity = capacity
+        self.overflow = overflow
+        self._entries = deque(maxlen=capacity)
+        self._last_seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        with self._lock:
+            self._last_seq += 1
+            entry['seq'] = self._last_seq
+            entry['id'] = f"log_{entry['seq']}"
+            evicted = self._entries[0] if len(self._entries) == self.capacity else None
+            self._entries.append(entry)
+        if evicted is not None and self.overflow:
+            self.overflow(evicted)
+        return entry
+
+    def add(self, entry):
+        """Keep an entry that already carries its ``seq``, in order; a seq already held is ignored."""
+        with self._lock:
+            entry.setdefault('id', f"log_{entry['seq']}")
+            if not self._entries or entry['seq'] > self._entries[-1]['seq']:
+                self._entries.append(entry)
+            elif all(held['seq'] != entry['seq'] for held in self._entries):
+                # Another worker's entry arriving late; rare enough to re-sort
+                entries = sorted([*self._entries, entry], key=lambda held: held['seq'])
+                self._entries = deque(entries[-self.capacity:], maxlen=self.capacity)
+            self._last_seq = max(self._last_seq, entry['seq'])
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    def since(self, seq, limit=None):
+        """Entries with a sequence number greater than ``seq``, oldest first."""
+        with self._lock:
+            # Entries written by other workers may not have arrived yet, so seqs can have gaps;
+            # the newer entries are few and at the right-hand end
+            start = len(self._entries)
+            while start and self._entries[start - 1]['seq'] > seq:
+                start -= 1
+            entries = list(islice(self._entries, start, None))
+        return entries[-limit:] if limit else entries
+
+    def tail(self, count):
+        with self._lock:
+            return list(islice(self._entries, max(0, len(self._entries) - count), None))
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries)
+
+
+class OverflowLog:
+    """Appends evicted entries as JSON lines to a rotating file.
+
+    The handler is opened lazily in each process, so a log created before
+    gunicorn forks its workers never shares a file handle across processes.
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._logger = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __call__(self, entry):
+        self._get_logger().info(json.dumps(entry))
+
+    def _get_logger(self):
+        with self._lock:
+            if self._logger is None or self._pid != os.getpid():
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                logger = logging.getLogger(f"writeup.activity.{os.getpid()}")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger.handlers = [handler]
+                self._logger = logger
+                self._pid = os.getpid()
+            return self._logger
@@ -0,0 +1,315 @@
+"""
+Analysis Pipeline for Enhanced Writeup Automation AI Tool
+Section extraction, planning and cached, rate-limited batch analysis, shared by the web app and offline tools
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import tempfile
+import uuid
+
+from analysis_cache import AnalysisCache, cache_key
+from analysis_provider import create_analysis_provider, create_async_analysis_provider
+from docx_stream import outline_level
+from guidelines_index import build_guidelines_index
+from heading_detector import HeadingDetector, SECTION_KEYWORDS
+from rate_limiter import create_rate_limiter, estimate_tokens
+from upload_store import ParseCache
+
+# Bump whenever canned_section_analysis (the stub provider) output changes so stale cache entries are ignored
+ANALYZER_VERSION = 'hawkeye-1'
+
+
+def pipeline_config(environ=None):
+    """Pipeline settings from the environment; the web app merges these into app.config."""
+    environ = os.environ if environ is None else environ
+    return {
+        # Process-wide pool the threaded engine's provider calls share
+        'SECTION_POOL_SIZE': int(environ.get('SECTION_POOL_SIZE', 8)),
+        # asyncio engine: provider calls in flight across all analyses
+        'ASYNC_MAX_IN_FLIGHT': int(environ.get('ASYNC_MAX_IN_FLIGHT', 512)),
+        'ANALYSIS_CACHE_MAX_BYTES': int(environ.get('ANALYSIS_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+        # Set to a directory to keep cached analyses across restarts
+        'ANALYSIS_CACHE_DIR': environ.get('ANALYSIS_CACHE_DIR'),
+        # 'stub' (canned in-process analysis) or 'http' (model service at ANALYSIS_PROVIDER_URL)
+        'ANALYSIS_PROVIDER': environ.get('ANALYSIS_PROVIDER', 'stub'),
+        'ANALYSIS_PROVIDER_URL': environ.get('ANALYSIS_PROVIDER_URL'),
+        'ANALYSIS_PROVIDER_MODEL': environ.get('ANALYSIS_PROVIDER_MODEL', ''),
+        'ANALYSIS_PROVIDER_API_KEY': environ.get('ANALYSIS_PROVIDER_API_KEY'),
+        'ANALYSIS_PROVIDER_TIMEOUT': float(environ.get('ANALYSIS_PROVIDER_TIMEOUT', 60)),
+        'ANALYSIS_PROVIDER_RETRIES': int(environ.get('ANALYSIS_PROVIDER_RETRIES', 2)),
+        # Provider budget shared by chat and analysis; 0 leaves a dimension unlimited
+        'RATE_LIMIT_RPS': float(environ.get('RATE_LIMIT_RPS', 0)),
+        'RATE_LIMIT_TPS': float(environ.get('RATE_LIMIT_TPS', 0)),
+        'RATE_LIMIT_BURST_SECONDS': float(environ.get('RATE_LIMIT_BURST_SECONDS', 1)),
+        # Share of each bucket analysis leaves untouched so chat never queues behind it
+        'RATE_LIMIT_ANALYSIS_RESERVE': float(environ.get('RATE_LIMIT_ANALYSIS_RESERVE', 0.2)),
+        # 'sqlite' makes all workers on a node draw from one budget; 'memory' is per process
+        'RATE_LIMIT_STORE': environ.get('RATE_LIMIT_STORE', 'memory'),
+        'RATE_LIMIT_STORE_PATH': environ.get('RATE_LIMIT_STORE_PATH', os.path.join(tempfile.gettempdir(), 'writeup_rate_limit.db')),
+        # Short sections are packed into one provider call up to these limits
+        'ANALYSIS_BATCH_MAX_SECTIONS': int(environ.get('ANALYSIS_BATCH_MAX_SECTIONS', 8)),
+        'ANALYSIS_BATCH_MAX_CHARS': int(environ.get('ANALYSIS_BATCH_MAX_CHARS', 12000)),
+        # Comma-separated keywords that mark a short bold paragraph as a section heading
+        'SECTION_KEYWORDS': environ.get('SECTION_KEYWORDS', ','.join(SECTION_KEYWORDS)).split(','),
+        # Guideline clauses handed to each section's analysis
+        'GUIDELINES_TOP_K': int(environ.get('GUIDELINES_TOP_K', 5)),
+        # Simulated model latency of the stub provider, in seconds
+        'STUB_ANALYSIS_DELAY': float(environ.get('STUB_ANALYSIS_DELAY', 2)),
+    }
+
+
+def docx_style_outline_level(style):
+    # Walk the base_style chain the same way docx_stream follows basedOn
+    seen = set()
+    while style is not None and style.style_id not in seen:
+        seen.add(style.style_id)
+        level = outline_level(style.element)
+        if level is not None:
+            return level
+        style = style.base_style
+    return None
+
+
+def extract_document_sections_from_docx(doc, detector):
+    sections = {}
+    current_section = "Executive Summary"
+    content = []
+    # para.style is a slow lookup, so resolve each distinct style id once
+    styles = {}
+
+    for para in doc.paragraphs:
+        text = para.text.strip()
+        if text:
+            style_id = para._p.style
+            if style_id not in styles:
+                style = para.style
+                styles[style_id] = (style.name, docx_style_outline_level(style))
+            style_name, level = styles[style_id]
+            direct_level = outline_level(para._p)
+            if direct_level is not None:
+                level = direct_level
+            is_bold = lambda: any(run.bold for run in para.runs)
+            if detector.is_heading(text, is_bold, style_name, level):
+                if content:
+                    sections[current_section] = '\n'.join(content)
+                current_section = text.rstrip(':')
+                content = []
+            else:
+                content.append(text)
+
+    if content:
+        sections[current_section] = '\n'.join(content)
+
+    return sections
+
+
+def canned_section_analysis(section_name, section_content, guidelines=None):
+    feedback_items = []
+    section_lower = section_name.lower()
+
+    if 'summary' in section_lower:
+        feedback_items.extend([
+            {
+                "id": f"ai_{uuid.uuid4().hex[:8]}",
+                "type": "critical",
+                "category": "completeness",
+                "description": "Executive summary lacks key performance metrics and quantitative data",
+                "suggestion": "Include specific numbers, percentages, and measurable outcomes to strengthen the summary",
+                "risk_level": "High",
+                "confidence": 0.92,
+                "example": "Add metrics like '25% improvement in efficiency' or 'reduced processing time by 3 days'",
+                "questions": ["Does this summary include quantifiable results?", "Are key stakeholders clearly identified?"]
+            },
+            {
+                "id": f"ai_{uuid.uuid4().hex[:8]}",
+                "type": "important",
+                "category": "structure",
+                "description": "Summary structure could be improved for better readability",
+                "suggestion": "Consider reorganizing content with clear subsections: Overview, Key Findings, Recommendations",
+                "risk_level": "Medium",
+                "confidence": 0.85,
+                "example": "Use bullet points for key achievements and numbered lists for recommendations",
+                "questions": ["Is the information presented in logical order?"]
+            }
+        ])
+
+    elif 'background' in section_lower or 'objective' in section_lower:
+        feedback_items.extend([
+            {
+                "id": f"ai_{uuid.uuid4().hex[:8]}",
+                "type": "critical",
+                "category": "compliance",
+                "description": "Missing regulatory compliance references and industry standards",
+                "suggestion": "Include references to relevant regulations, standards, or company policies",
+                "risk_level": "High",
+                "confidence": 0.88,
+                "example": "Reference ISO standards, regulatory requirements, or internal compliance frameworks",
+                "questions": ["Are all applicable regulations mentioned?", "Is the scope clearly defined?"]
+            }
+        ])
+
+    elif 'analysis' in section_lower:
+        feedback_items.extend([
+            {
+                "id": f"ai_{uuid.uuid4().hex[:8]}",
+                "type": "critical",
+                "category": "methodology",
+                "description": "Analysis methodology needs more detailed explanation",
+                "suggestion": "Provide step-by-step methodology, data sources, and analytical frameworks used",
+                "risk_level": "High",
+                "confidence": 0.90,
+                "example": "Describe data collection methods, sample sizes, analytical tools, and validation processes",
+                "questions": ["Is the methodology reproducible?", "Are data sources reliable and current?"]
+            },
+            {
+                "id": f"ai_{uuid.uuid4().hex[:8]}",
+                "type": "important",
+                "category": "evidence",
+                "description": "Supporting evidence and documentation could be strengthened",
+                "suggestion": "Add more supporting data, charts, or references to strengthen conclusions",
+                "risk_level": "Medium",
+                "confidence": 0.83,
+                "example": "Include trend analysis, comparative data, or statistical significance tests",
+                "questions": ["Are conclusions supported by sufficient evidence?"]
+            }
+        ])
+
+    # Add positive feedback
+    if random.random() > 0.3:
+        feedback_items.append({
+            "id": f"ai_{uuid.uuid4().hex[:8]}",
+            "type": "positive",
+            "category": "strength",
+            "description": f"Strong content structure and clear presentation in {section_name}",
+            "suggestion": "Continue maintaining this level of clarity and organization",
+            "risk_level": "Low",
+            "confidence": 0.95,
+            "example": "The logical flow and professional tone enhance readability",
+            "questions": []
+        })
+
+    return {"feedback_items": feedback_items}
+
+
+def batch_tokens(batch):
+    return estimate_tokens(*(text for _section_name, content, guidelines in batch for text in (content, guidelines)))
+
+
+async def run_blocking(function, *args):
+    """Run a call that can wait on SQLite or the disk in a thread, so it never stalls the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+class AnalysisPipeline:
+    """Everything between a document's sections and their analyses, for one process.
+
+    Holds the heading detector, the result cache, the threaded and async
+    providers and the provider rate limiter, all built from ``config`` (see
+    pipeline_config). Importing this module builds none of them, so offline
+    tools and pool workers get the pipeline without the web app's session
+    store, scheduler or journal. ``engine`` is the AsyncAnalysisEngine whose
+    in-flight cap async provider calls go through; only
+    analyze_sections_cached_async needs it.
+    """
+
+    def __init__(self, config, engine=None, parse_cache=None):
+        self.config = config
+        self.engine = engine
+        # Guidelines indexes are keyed by content, so callers may share their upload parse cache
+        self.parse_cache = parse_cache or ParseCache()
+        self.heading_detector = HeadingDetector(config['SECTION_KEYWORDS'])
+        self.cache = AnalysisCache(
+            max_bytes=config['ANALYSIS_CACHE_MAX_BYTES'],
+            disk_dir=config['ANALYSIS_CACHE_DIR']
+        )
+        self.provider = create_analysis_provider(
+            config['ANALYSIS_PROVIDER'], pool_size=config['SECTION_POOL_SIZE'], **self._provider_options()
+        )
+        # Same backend and cache version as provider, awaited on the asyncio engine
+        self.async_provider = create_async_analysis_provider(
+            config['ANALYSIS_PROVIDER'], pool_size=config['ASYNC_MAX_IN_FLIGHT'], **self._provider_options()
+        )
+        self.rate_limiter = create_rate_limiter(
+            config['RATE_LIMIT_STORE'],
+            config['RATE_LIMIT_STORE_PATH'],
+            requests_per_second=config['RATE_LIMIT_RPS'],
+            tokens_per_second=config['RATE_LIMIT_TPS'],
+            burst_seconds=config['RATE_LIMIT_BURST_SECONDS'],
+            analysis_reserve=config['RATE_LIMIT_ANALYSIS_RESERVE']
+        )
+
+    def _provider_options(self):
+        config = self.config
+        return {
+            'stub_analyze': canned_section_analysis,
+            'stub_delay': config['STUB_ANALYSIS_DELAY'],
+            'stub_version': ANALYZER_VERSION,
+            'url': config['ANALYSIS_PROVIDER_URL'],
+            'model': config['ANALYSIS_PROVIDER_MODEL'],
+            'api_key': config['ANALYSIS_PROVIDER_API_KEY'],
+            'timeout': config['ANALYSIS_PROVIDER_TIMEOUT'],
+            'retries': config['ANALYSIS_PROVIDER_RETRIES'],
+            'max_batch_sections': config['ANALYSIS_BATCH_MAX_SECTIONS'],
+            'max_batch_chars': config['ANALYSIS_BATCH_MAX_CHARS'],
+        }
+
+    def guidelines_index_for(self, guidelines_content):
+        # Keyed by content rather than upload, so sessions reloaded from the store share one index
+        key = hashlib.sha256(guidelines_content.encode('utf-8')).hexdigest()
+        index, _ = self.parse_cache.get_or_parse(('guidelines_index', key), lambda: build_guidelines_index(guidelines_content))
+        return index
+
+    def plan_sections(self, sections, guidelines_content=None):
+        """(section_name, content, guidelines) for each (section_name, content), in order."""
+        guidelines_index = self.guidelines_index_for(guidelines_content) if guidelines_content else None
+
+        planned = []
+        for section_name, content in sections:
+            # Only the clauses relevant to this section go into its analysis
+            guidelines = None
+            if guidelines_index is not None:
+                guidelines = '\n'.join(guidelines_index.top_k(section_name, content, self.config['GUIDELINES_TOP_K'])) or None
+            planned.append((section_name, content, guidelines))
+        return planned
+
+    def cached_results(self, batch, version):
+        """Cache keys and cached results (None on a miss) for a batch of (section_name, content, guidelines)."""
+        keys = [cache_key(section_name, content, guidelines, version) for section_name, content, guidelines in batch]
+        return keys, [self.cache.get(key) for key in keys]
+
+    def merge_results(self, batch, keys, results, misses, fresh):
+        for i, result in zip(misses, fresh):
+            self.cache.put(keys[i], result)
+            results[i] = result
+        return [(section_name, result) for (section_name, _content, _guidelines), result in zip(batch, results)]
+
+    def analyze_sections_cached(self, batch, cancel_token=None):
+        """Analyze a batch of (section_name, content, guidelines), sending only cache misses to the provider."""
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        keys, results = self.cached_results(batch, self.provider.version)
+        misses = [i for i, result in enumerate(results) if result is None]
+        fresh = []
+        if misses:
+            self.rate_limiter.acquire('analysis', batch_tokens([batch[i] for i in misses]), cancel_token)
+            fresh = self.provider.analyze_batch([batch[i] for i in misses], cancel_token)
+        return self.merge_results(batch, keys, results, misses, fresh)
+
+    async def _run_cached(self, function, *args):
+        # The memory tier is a dict lookup; only the disk tier reads files and is worth a thread hop
+        if self.cache.disk_dir:
+            return await run_blocking(function, *args)
+        return function(*args)
+
+    async def analyze_sections_cached_async(self, batch):
+        keys, results = await self._run_cached(self.cached_results, batch, self.async_provider.version)
+        misses = [i for i, result in enumerate(results) if result is None]
+        fresh = []
+        if misses:
+            # Wait for budget before taking an in-flight slot, so throttled calls don't hold slots
+            await self.rate_limiter.acquire_async('analysis', batch_tokens([batch[i] for i in misses]))
+            fresh = await self.engine.call(self.async_provider.analyze_batch, [batch[i] for i in misses])
+        return await self._run_cached(self.merge_results, batch, keys, results, misses, fresh)
@@ -0,0 +1,496 @@
+"""
+Analysis Providers for Enhanced Writeup Automation AI Tool
+Pluggable section analysis backends: the built-in stub and a pooled, batching HTTP client
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import queue
+import socket
+import ssl
+import threading
+import uuid
+from collections import deque
+from urllib.parse import urlsplit
+
+from cancellation import CancelToken
+
+
+class ProviderError(Exception):
+    pass
+
+
+class AnalysisProvider:
+    """Analyzes sections; subclasses override ``analyze_batch`` and optionally ``plan_batches``.
+
+    ``version`` is folded into analysis cache keys, so switching backends
+    or models never serves results produced by another one.
+    """
+
+    name = 'base'
+    version = 'base'
+
+    def analyze(self, section_name, content, guidelines=None, cancel_token=None):
+        return self.analyze_batch([(section_name, content, guidelines)], cancel_token)[0]
+
+    def analyze_batch(self, sections, cancel_token=None):
+        """Analyze (section_name, content, guidelines) triples, returning results in the same order.
+
+        Raises ``Cancelled`` promptly, even mid-call, once ``cancel_token`` is cancelled.
+        """
+        raise NotImplementedError
+
+    def plan_batches(self, sections):
+        """Group (section_name, content, guidelines) triples into calls; one section per call by default."""
+        return [[section] for section in sections]
+
+    def stats(self):
+        return {'provider': self.name, 'version': self.version}
+
+
+class StubProvider(AnalysisProvider):
+    """Wraps the canned in-process analysis used for demos and development."""
+
+    name = 'stub'
+
+    def __init__(self, analyze, delay, version):
+        self._analyze = analyze
+        self.delay = delay
+        self.version = version
+
+    def analyze_batch(self, sections, cancel_token=None):
+        # Simulated model latency, cut short by cancellation
+        (cancel_token or CancelToken()).sleep(self.delay)
+        return [self._analyze(section_name, content, guidelines) for section_name, content, guidelines in sections]
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused across calls and threads.
+
+    Connections are created lazily and the pool is rebuilt after a fork, so
+    gunicorn workers never share sockets inherited from the master.
+    """
+
+    def __init__(self, url, size=8, timeout=60):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.size = size
+        self.timeout = timeout
+        self._idle = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _queue(self):
+        with self._lock:
+            if self._idle is None or self._pid != os.getpid():
+                self._idle = queue.LifoQueue(maxsize=self.size)
+                self._pid = os.getpid()
+            return self._idle
+
+    def acquire(self):
+        """Return (connection, reused)."""
+        try:
+            connection = self._queue().get_nowait()
+            self.reused += 1
+            return connection, True
+        except queue.Empty:
+            pass
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        self.created += 1
+        return connection_class(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, connection):
+        try:
+            self._queue().put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def discard(self, connection):
+        connection.close()
+
+    def abort(self, connection):
+        """Unblock a thread reading from ``connection``; safe to call from any thread."""
+        sock = connection.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+# Failures of a reused keep-alive socket the server had already closed
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def pack_batches(sections, max_sections, max_chars):
+    """Pack consecutive sections into batches bounded by count and characters; long sections go alone."""
+    batches = []
+    batch, batch_chars = [], 0
+    for section in sections:
+        size = len(section[1]) + len(section[2] or '')
+        if batch and (len(batch) >= max_sections or batch_chars + size > max_chars):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append(section)
+        batch_chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _normalise(result):
+    items = []
+    for item in result.get('feedback_items', []):
+        item = dict(item)
+        item.setdefault('id', f"ai_{uuid.uuid4().hex[:8]}")
+        items.append(item)
+    return {'feedback_items': items}
+
+
+class _HTTPBatching:
+    """Configuration, wire format and counters shared by the sync and async HTTP providers.
+
+    Request:  POST <url> {"model": ..., "sections": [{"id", "section_name", "content", "guidelines"}]}
+    Response: {"results": [{"id": ..., "feedback_items": [...]}]}
+
+    Short sections are packed into one request up to ``max_batch_sections``
+    sections or ``max_batch_chars`` characters. Each attempt is bounded by
+    ``timeout``; connection errors, timeouts, 429 and 5xx responses are
+    retried up to ``retries`` times with exponential backoff.
+    """
+
+    name = 'http'
+
+    def __init__(self, url, model='', api_key=None, timeout=60, retries=2, backoff=0.5,
+                 pool_size=8, max_batch_sections=8, max_batch_chars=12000):
+        self.url = url
+        self.path = urlsplit(url).path or '/'
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.max_batch_sections = max_batch_sections
+        self.max_batch_chars = max_batch_chars
+        self.version = f"http:{url}:{model}"
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._sections = 0
+        self._retries = 0
+        self._failures = 0
+
+    def plan_batches(self, sections):
+        return pack_batches(sections, self.max_batch_sections, self.max_batch_chars)
+
+    def _headers(self):
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        return headers
+
+    def _payload(self, sections):
+        return json.dumps({
+            'model': self.model,
+            'sections': [
+                {'id': str(i), 'section_name': section_name, 'content': content, 'guidelines': guidelines}
+                for i, (section_name, content, guidelines) in enumerate(sections)
+            ]
+        }).encode('utf-8')
+
+    def _results(self, response, sections):
+        with self._lock:
+            self._requests += 1
+            self._sections += len(sections)
+        by_id = {str(result.get('id')): result for result in response.get('results', [])}
+        results = []
+        for i in range(len(sections)):
+            result = by_id.get(str(i))
+            if result is None:
+                raise ProviderError(f"Provider returned no result for section {sections[i][0]}")
+            results.append(_normalise(result))
+        return results
+
+    def _handle_response(self, status, data):
+        """Decoded body for a 200, None for a retryable status; raises otherwise."""
+        if status == 200:
+            try:
+                return json.loads(data)
+            except ValueError:
+                self._record_failure()
+                raise ProviderError(f"Provider returned invalid JSON: {data[:200]!r}")
+        if status not in RETRYABLE_STATUS:
+            self._record_failure()
+            raise ProviderError(f"Provider returned HTTP {status}: {data[:200]!r}")
+        return None
+
+    def _retry_delay(self, attempt, error, retry_after):
+        """Seconds to wait before retry number ``attempt``; raises once retries are used up."""
+        if attempt > self.retries:
+            self._record_failure()
+            raise ProviderError(f"Provider call failed after {attempt} attempts: {error}")
+        with self._lock:
+            self._retries += 1
+        delay = self.backoff * (2 ** (attempt - 1))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        return delay
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'provider': self.name,
+                'version': self.version,
+                'requests': self._requests,
+                'sections': self._sections,
+                'sections_per_request': round(self._sections / self._requests, 2) if self._requests else 0.0,
+                'retries': self._retries,
+                'failures': self._failures,
+                'connections_created': self.pool.created,
+                'connections_reused': self.pool.reused
+            }
+
+
+class HTTPProvider(_HTTPBatching, AnalysisProvider):
+    """Blocking HTTP provider over a pool of keep-alive connections."""
+
+    def __init__(self, url, **options):
+        super().__init__(url, **options)
+        self.pool = ConnectionPool(url, size=self.pool_size, timeout=self.timeout)
+
+    def analyze_batch(self, sections, cancel_token=None):
+        return self._results(self._post(self._payload(sections), cancel_token or CancelToken()), sections)
+
+    def _post(self, body, cancel_token):
+        headers = self._headers()
+        attempt = 0
+        while True:
+            cancel_token.raise_if_cancelled()
+            connection, reused = self.pool.acquire()
+            # Cancelling shuts the socket down, so a read blocked on a slow provider fails at once
+            abort = cancel_token.on_cancel(lambda: self.pool.abort(connection))
+            try:
+                connection.request('POST', self.path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except STALE_CONNECTION_ERRORS as e:
+                self.pool.discard(connection)
+                if reused:
+                    # The server closed an idle keep-alive socket; retry at once on a fresh one
+                    continue
+                error, retry_after = e, None
+            except (OSError, http.client.HTTPException) as e:
+                self.pool.discard(connection)
+                error, retry_after = e, None
+            else:
+                if response.will_close:
+                    self.pool.discard(connection)
+                else:
+                    self.pool.release(connection)
+                decoded = self._handle_response(response.status, data)
+                if decoded is not None:
+                    return decoded
+                error = ProviderError(f"Provider returned HTTP {response.status}")
+                retry_after = response.getheader('Retry-After')
+            finally:
+                cancel_token.remove(abort)
+
+            cancel_token.raise_if_cancelled()
+            attempt += 1
+            cancel_token.sleep(self._retry_delay(attempt, error, retry_after))
+
+
+class AsyncAnalysisProvider:
+    """Async counterpart of AnalysisProvider, for providers run on the asyncio engine."""
+
+    name = 'base'
+    version = 'base'
+
+    async def analyze_batch(self, sections):
+        """Cancelled through asyncio task cancellation rather than a cancel token."""
+        raise NotImplementedError
+
+    def plan_batches(self, sections):
+        return [[section] for section in sections]
+
+    def stats(self):
+        return {'provider': self.name, 'version': self.version}
+
+
+class AsyncStubProvider(AsyncAnalysisProvider):
+    """The canned analysis with its simulated latency awaited instead of slept."""
+
+    name = 'stub'
+
+    def __init__(self, analyze, delay, version):
+        self._analyze = analyze
+        self.delay = delay
+        self.version = version
+
+    async def analyze_batch(self, sections):
+        await asyncio.sleep(self.delay)
+        return [self._analyze(section_name, content, guidelines) for section_name, content, guidelines in sections]
+
+
+class AsyncConnectionPool:
+    """Idle keep-alive (reader, writer) pairs for one host, owned by a single event loop."""
+
+    def __init__(self, url, size=8):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == 'https' else 80)
+        self.host_header = parts.netloc
+        self.size = size
+        self._idle = deque()
+        self._loop = None
+        self.created = 0
+        self.reused = 0
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams belong to the loop that opened them
+            self._idle.clear()
+            self._loop = loop
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing():
+                self.reused += 1
+                return (reader, writer), True
+        ssl_context = ssl.create_default_context() if self.scheme == 'https' else None
+        connection = await asyncio.open_connection(self.host, self.port, ssl=ssl_context)
+        self.created += 1
+        return connection, False
+
+    def release(self, connection):
+        if len(self._idle) < self.size:
+            self._idle.append(connection)
+        else:
+            self.discard(connection)
+
+    def discard(self, connection):
+        # None when the connection attempt itself failed
+        if connection is not None:
+            connection[1].close()
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed by provider")
+    version, status = status_line.decode('latin-1').split(' ', 2)[:2]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    will_close = version == 'HTTP/1.0' or headers.get('connection', '').lower() == 'close'
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        data = b''.join(chunks)
+    elif 'content-length' in headers:
+        data = await reader.readexactly(int(headers['content-length']))
+    else:
+        data = await reader.read()
+        will_close = True
+    return int(status), headers, data, will_close
+
+
+class AsyncHTTPProvider(_HTTPBatching, AsyncAnalysisProvider):
+    """HTTP provider on asyncio streams: thousands of calls can wait on the network without a thread each."""
+
+    def __init__(self, url, **options):
+        super().__init__(url, **options)
+        self.pool = AsyncConnectionPool(url, size=self.pool_size)
+
+    async def analyze_batch(self, sections):
+        return self._results(await self._post(self._payload(sections)), sections)
+
+    async def _exchange(self, connection, body, headers):
+        reader, writer = connection
+        head = [f"POST {self.path} HTTP/1.1", f"Host: {self.pool.host_header}", f"Content-Length: {len(body)}"]
+        head.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+        return await _read_response(reader)
+
+    async def _post(self, body):
+        headers = self._headers()
+        attempt = 0
+        while True:
+            connection, reused = None, False
+            try:
+                connection, reused = await asyncio.wait_for(self.pool.acquire(), self.timeout)
+                status, response_headers, data, will_close = await asyncio.wait_for(
+                    self._exchange(connection, body, headers), self.timeout
+                )
+            except asyncio.CancelledError:
+                # A half-read response would poison the connection for the next call
+                self.pool.discard(connection)
+                raise
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError) as e:
+                self.pool.discard(connection)
+                if reused:
+                    # The server closed an idle keep-alive socket; retry at once on a fresh one
+                    continue
+                error, retry_after = e, None
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                self.pool.discard(connection)
+                error, retry_after = e, None
+            else:
+                if will_close:
+                    self.pool.discard(connection)
+                else:
+                    self.pool.release(connection)
+                decoded = self._handle_response(status, data)
+                if decoded is not None:
+                    return decoded
+                error = ProviderError(f"Provider returned HTTP {status}")
+                retry_after = response_headers.get('retry-after')
+
+            attempt += 1
+            await asyncio.sleep(self._retry_delay(attempt, error, retry_after))
+
+
+def create_analysis_provider(backend, stub_analyze=None, stub_delay=0, stub_version=None, **options):
+    if backend == 'stub':
+        return StubProvider(stub_analyze, stub_delay, stub_version)
+    if backend == 'http':
+        if not options.get('url'):
+            raise ValueError("ANALYSIS_PROVIDER=http requires ANALYSIS_PROVIDER_URL")
+        return HTTPProvider(**options)
+    raise ValueError(f"Unknown analysis provider: {backend}")
+
+
+def create_async_analysis_provider(backend, stub_analyze=None, stub_delay=0, stub_version=None, **options):
+    if backend == 'stub':
+        return AsyncStubProvider(stub_analyze, stub_delay, stub_version)
+    if backend == 'http':
+        if not options.get('url'):
+            raise ValueError("ANALYSIS_PROVIDER=http requires ANALYSIS_PROVIDER_URL")
+        return AsyncHTTPProvider(**options)
+    raise ValueError(f"Unknown analysis provider: {backend}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Analysis Stand-in Server
+Serves the HTTPProvider batch contract locally so the HTTP provider can be exercised without a model service
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RISK_BY_KEYWORD = [
+    ('summary', 'critical', 'High', 'Summary lacks quantified outcomes'),
+    ('background', 'important', 'Medium', 'Background omits the governing policy references'),
+    ('analysis', 'critical', 'High', 'Methodology and data sources are not described'),
+    ('recommendation', 'important', 'Medium', 'Recommendations have no owners or deadlines'),
+]
+
+
+def analyze(section):
+    name = section.get('section_name', '').lower()
+    items = [
+        {
+            'id': f"ai_{uuid.uuid4().hex[:8]}",
+            'type': feedback_type,
+            'category': 'stand-in',
+            'description': description,
+            'suggestion': 'Address the gap noted above',
+            'risk_level': risk,
+            'confidence': 0.8,
+            'example': '',
+            'questions': []
+        }
+        for keyword, feedback_type, risk, description in RISK_BY_KEYWORD if keyword in name
+    ]
+    items.append({
+        'id': f"ai_{uuid.uuid4().hex[:8]}",
+        'type': 'positive',
+        'category': 'strength',
+        'description': f"Clear presentation in {section.get('section_name', '')}",
+        'suggestion': 'Keep this structure',
+        'risk_level': 'Low',
+        'confidence': 0.9,
+        'example': '',
+        'questions': []
+    })
+    return {'id': section.get('id'), 'feedback_items': items}
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for benchmark bursts of hundreds of simultaneous connections
+    request_queue_size = 1024
+
+
+def make_handler(latency, per_section, fail_rate, stats):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open between requests
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            with stats['lock']:
+                stats['requests'] += 1
+
+            if fail_rate and random.random() < fail_rate:
+                self._send(503, {'error': 'stand-in failure'})
+                return
+
+            try:
+                sections = json.loads(body).get('sections', [])
+            except ValueError:
+                self._send(400, {'error': 'invalid JSON'})
+                return
+
+            # One round trip of model latency per request, plus a small cost per section
+            time.sleep(latency + per_section * len(sections))
+            with stats['lock']:
+                stats['sections'] += len(sections)
+            self._send(200, {'results': [analyze(section) for section in sections]})
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client cancelled the call and hung up
+                self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8765, latency=2.0, per_section=0.05, fail_rate=0.0):
+    """Start the stand-in server in a background thread and return it."""
+    stats = {'lock': threading.Lock(), 'requests': 0, 'sections': 0}
+    server = StandInServer(('127.0.0.1', port), make_handler(latency, per_section, fail_rate, stats))
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=2.0, help='seconds per request')
+    parser.add_argument('--per-section', type=float, default=0.05, help='extra seconds per section in a batch')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    server = serve(args.port, args.latency, args.per_section, args.fail_rate)
+    print(f"Stand-in analysis service on http://127.0.0.1:{args.port}/analyze")
+    print(f"Run the app with ANALYSIS_PROVIDER=http ANALYSIS_PROVIDER_URL=http://127.0.0.1:{args.port}/analyze")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
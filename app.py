@@ -13,6 +13,9 @@ import uuid
 from collections import defaultdict
 import sys
 
+from session_registry import SessionRegistry
+from activity_log import ActivityLog
+
 # Import with fallback
 try:
     from docx import Document
@@ -25,18 +28,21 @@ app = Flask(__name__)
 # Universal configuration that works everywhere
 app.config['UPLOAD_FOLDER'] = os.path.join(os.getcwd(), 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024
+app.config['MAX_SESSIONS'] = int(os.environ.get('MAX_SESSIONS', 500))
+app.config['SESSION_IDLE_TTL'] = int(os.environ.get('SESSION_IDLE_TTL', 3600))
+app.config['ACTIVITY_LOG_CAPACITY'] = int(os.environ.get('ACTIVITY_LOG_CAPACITY', 500))
+
+# Clients identify their session with this header (per tab) or cookie (per browser)
+SESSION_HEADER = 'X-Session-ID'
+SESSION_COOKIE = 'session_id'
 
 # Create uploads directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Global variables (same as original)
-current_session = None
-analysis_progress = {"progress": 0, "message": "Ready", "current_section": ""}
-analysis_status = "idle"
-analysis_logs = []
+# Entries not tied to any session; each session keeps its own bounded log
+system_log = ActivityLog(app.config['ACTIVITY_LOG_CAPACITY'])
 chat_history = []
-analysis_complete = False
-functionalities_enabled = False
 
 # Copy all your existing classes and functions here
 class AnalysisSession:
@@ -54,6 +60,12 @@ class AnalysisSession:
         self.stop_analysis_flag = False
         self.guidelines_document = None
         self.guidelines_content = None
+        self.analysis_status = "idle"
+        self.analysis_progress = {"progress": 0, "message": "Ready", "current_section": ""}
+        self.analysis_complete = False
+        self.functionalities_enabled = False
+        self.activity_log = ActivityLog(app.config['ACTIVITY_LOG_CAPACITY'])
+        self.lock = threading.RLock()
         
     def get_section_names(self):
         return list(self.sections.keys())
@@ -64,6 +76,16 @@ class AnalysisSession:
             return section_names[self.current_section_index]
         return None
 
+sessions = SessionRegistry(
+    max_sessions=app.config['MAX_SESSIONS'],
+    idle_ttl=app.config['SESSION_IDLE_TTL'],
+    is_pinned=lambda session: session.analysis_status == "running"
+)
+
+def get_request_session():
+    session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+    return sessions.get(session_id)
+
 def extract_document_sections_from_docx(doc):
     if not doc:
         return {"Sample Section": "Document processing not available"}
@@ -140,16 +162,16 @@ def process_chat_query(query, context):
     
     return f"**Hello! I'm TARA, your AI document analysis assistant.**\n\nI've completed analyzing {doc_name} and can help with analysis support and guidance.\n\nWhat would you like to explore?"
 
-def log_activity(message, level="INFO", section=None):
+def log_activity(message, level="INFO", section=None, session=None):
     log_entry = {
-        "id": f"log_{uuid.uuid4().hex[:8]}",
         "timestamp": datetime.now().isoformat(),
         "level": level,
         "message": message,
-        "section": section
+        "section": section,
+        "session_id": session.session_id if session else None
     }
-    analysis_logs.append(log_entry)
-    return log_entry
+    # append numbers the entry and sets its id
+    return (session.activity_log if session else system_log).append(log_entry)
 
 # Static files route for deployment
 @app.route('/static/<path:filename>')
@@ -163,8 +185,6 @@ def index():
 
 @app.route('/api/upload', methods=['POST'])
 def upload_document():
-    global current_session, analysis_status
-    
     if 'file' not in request.files:
         return jsonify({'success': False, 'error': 'No file uploaded'}), 400
     
@@ -172,10 +192,9 @@ def upload_document():
     if not file.filename.endswith('.docx'):
         return jsonify({'success': False, 'error': 'Please upload a .docx file'}), 400
     
+    current_session = AnalysisSession()
+    
     try:
-        current_session = AnalysisSession()
-        analysis_status = "idle"
-        
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
@@ -190,10 +209,11 @@ def upload_document():
             sections = {"Sample Section": "Document uploaded successfully. Full processing requires python-docx."}
         
         current_session.sections = sections
+        sessions.add(current_session)
         
-        log_activity(f"Document uploaded: {filename} ({len(sections)} sections)", "SUCCESS")
+        log_activity(f"Document uploaded: {filename} ({len(sections)} sections)", "SUCCESS", session=current_session)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'session_id': current_session.session_id,
             'document_name': filename,
@@ -201,41 +221,42 @@ def upload_document():
             'total_sections': len(sections),
             'file_size': os.path.getsize(filepath)
         })
+        response.set_cookie(SESSION_COOKIE, current_session.session_id, httponly=True, samesite='Lax')
+        return response
         
     except Exception as e:
-        log_activity(f"Upload failed: {str(e)}", "ERROR")
+        log_activity(f"Upload failed: {str(e)}", "ERROR", session=current_session)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/start_analysis', methods=['POST'])
 def start_analysis():
-    global current_session, analysis_status, analysis_progress, analysis_complete, functionalities_enabled
+    current_session = get_request_session()
     
     if not current_session:
         return jsonify({'success': False, 'error': 'No document uploaded'}), 400
     
-    if analysis_status == "running":
-        return jsonify({'success': False, 'error': 'Analysis already in progress'}), 400
-    
-    analysis_status = "running"
-    analysis_progress = {"progress": 0, "message": "Initializing Analysis...", "current_section": ""}
-    current_session.stop_analysis_flag = False
-    analysis_complete = False
-    functionalities_enabled = False
+    with current_session.lock:
+        if current_session.analysis_status == "running":
+            return jsonify({'success': False, 'error': 'Analysis already in progress'}), 400
+        
+        current_session.analysis_status = "running"
+        current_session.analysis_progress = {"progress": 0, "message": "Initializing Analysis...", "current_section": ""}
+        current_session.stop_analysis_flag = False
+        current_session.analysis_complete = False
+        current_session.functionalities_enabled = False
     
     def run_analysis():
-        global analysis_status, analysis_progress, analysis_complete, functionalities_enabled
-        
         try:
             section_names = current_session.get_section_names()
             total_sections = len(section_names)
             
             for i, section_name in enumerate(section_names):
                 if current_session.stop_analysis_flag:
-                    analysis_status = "stopped"
+                    current_session.analysis_status = "stopped"
                     return
                 
                 progress_percent = int((i / total_sections) * 85)
-                analysis_progress = {
+                current_session.analysis_progress = {
                     "progress": progress_percent,
                     "message": f"Analyzing {section_name} ({i+1}/{total_sections})",
                     "current_section": section_name
@@ -243,18 +264,20 @@ def start_analysis():
                 
                 section_content = current_session.sections[section_name]
                 result = analyze_section_with_ai(section_name, section_content)
-                current_session.analysis_results[section_name] = result
+                with current_session.lock:
+                    current_session.analysis_results[section_name] = result
                 
                 time.sleep(1.5)
             
-            analysis_progress = {"progress": 100, "message": "Analysis completed!", "current_section": ""}
-            analysis_status = "completed"
-            analysis_complete = True
-            functionalities_enabled = True
+            with current_session.lock:
+                current_session.analysis_progress = {"progress": 100, "message": "Analysis completed!", "current_section": ""}
+                current_session.analysis_status = "completed"
+                current_session.analysis_complete = True
+                current_session.functionalities_enabled = True
             
         except Exception as e:
-            analysis_status = "error"
-            analysis_progress["message"] = f"Analysis failed: {str(e)}"
+            current_session.analysis_status = "error"
+            current_session.analysis_progress["message"] = f"Analysis failed: {str(e)}"
     
     current_session.analysis_thread = threading.Thread(target=run_analysis)
     current_session.analysis_thread.daemon = True
@@ -264,13 +287,13 @@ def start_analysis():
 
 @app.route('/api/status')
 def get_status():
-    global analysis_status, analysis_progress, analysis_logs, analysis_complete, functionalities_enabled
+    current_session = get_request_session()
     
     if not current_session:
         return jsonify({
             'status': 'no_session',
-            'progress': analysis_progress,
-            'logs': analysis_logs[-10:],
+            'progress': {"progress": 0, "message": "Ready", "current_section": ""},
+            'logs': [],
             'analysis_complete': False,
             'functionalities_enabled': False,
             'statistics': {'total_sections': 0, 'analyzed_sections': 0, 'total_feedback': 0, 'high_risk': 0, 'medium_risk': 0, 'low_risk': 0}
@@ -278,21 +301,22 @@ def get_status():
     
     # Calculate statistics
     total_feedback = high_risk = medium_risk = low_risk = 0
-    for result in current_session.analysis_results.values():
-        feedback_items = result.get('feedback_items', [])
-        total_feedback += len(feedback_items)
-        for item in feedback_items:
-            risk_level = item.get('risk_level', 'Low')
-            if risk_level == 'High': high_risk += 1
-            elif risk_level == 'Medium': medium_risk += 1
-            else: low_risk += 1
+    with current_session.lock:
+        for result in current_session.analysis_results.values():
+            feedback_items = result.get('feedback_items', [])
+            total_feedback += len(feedback_items)
+            for item in feedback_items:
+                risk_level = item.get('risk_level', 'Low')
+                if risk_level == 'High': high_risk += 1
+                elif risk_level == 'Medium': medium_risk += 1
+                else: low_risk += 1
     
     return jsonify({
-        'status': analysis_status,
-        'progress': analysis_progress,
-        'logs': analysis_logs[-20:],
-        'analysis_complete': analysis_complete,
-        'functionalities_enabled': functionalities_enabled,
+        'status': current_session.analysis_status,
+        'progress': current_session.analysis_progress,
+        'logs': current_session.activity_log.tail(20),
+        'analysis_complete': current_session.analysis_complete,
+        'functionalities_enabled': current_session.functionalities_enabled,
         'statistics': {
             'total_sections': len(current_session.sections),
             'analyzed_sections': len(current_session.analysis_results),
@@ -305,11 +329,13 @@ def get_status():
 
 @app.route('/api/sections')
 def get_sections():
+    current_session = get_request_session()
+    
     if not current_session:
         return jsonify({'sections': []})
     
     sections_info = []
-    for section_name, content in current_session.sections.items():
+    for section_name, content in list(current_session.sections.items()):
         analysis_result = current_session.analysis_results.get(section_name, {})
         feedback_items = analysis_result.get('feedback_items', [])
         
@@ -332,6 +358,8 @@ def get_sections():
 
 @app.route('/api/section/<section_name>')
 def get_section_analysis(section_name):
+    current_session = get_request_session()
+    
     if not current_session or section_name not in current_session.sections:
         return jsonify({'success': False, 'error': 'Section not found'}), 404
     
@@ -349,6 +377,8 @@ def get_section_analysis(section_name):
 
 @app.route('/api/chat/basic', methods=['POST'])
 def basic_chat():
+    current_session = get_request_session()
+    
     try:
         data = request.json
         message = data.get('message', '').strip()
@@ -359,7 +389,7 @@ def basic_chat():
         context = {
             'current_section': current_session.get_current_section_name() if current_session else None,
             'document_name': current_session.document_name if current_session else None,
-            'functionalities_enabled': functionalities_enabled
+            'functionalities_enabled': current_session.functionalities_enabled if current_session else False
         }
         
         response = process_chat_query(message, context)
@@ -388,9 +418,14 @@ def health_check():
 def ping():
     return 'pong'
 
-# Railway startup check
-@app.before_first_request
+# Railway startup check; Flask 2.3 dropped before_first_request, so run once from before_request
+startup_done = threading.Event()
+
+@app.before_request
 def startup():
+    if startup_done.is_set():
+        return
+    startup_done.set()
     print(f"App started successfully on port {os.environ.get('PORT', '5005')}")
     print(f"Health check: /health")
     print(f"Main app: /")
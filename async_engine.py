@@ -0,0 +1,132 @@
+"""
+Async Analysis Engine for Enhanced Writeup Automation AI Tool
+Runs analysis jobs as coroutines on one event-loop thread instead of a thread per job
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from job_scheduler import Job, QueueFull
+
+
+class AsyncAnalysisEngine:
+    """Runs analysis coroutines on a dedicated event loop.
+
+    Every job and every provider call waiting on the network is a coroutine
+    rather than a thread, so the number of documents being analyzed is
+    bounded by ``max_jobs`` and the provider calls in flight across all of
+    them by ``max_in_flight``, not by the size of a thread pool. Flask routes
+    submit jobs from their request threads and read results back through the
+    session, exactly as with the threaded scheduler.
+
+    The loop thread is started lazily in the process that first submits,
+    which keeps the engine intact when gunicorn forks a preloaded app.
+    """
+
+    def __init__(self, max_jobs=1000, max_in_flight=512):
+        self.max_jobs = max_jobs
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._in_flight_limit = None
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._avg_run = 0.0
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return self._loop
+            self._pid = os.getpid()
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            thread = threading.Thread(target=self._run_loop, args=(self._loop, ready), name='analysis-event-loop')
+            thread.daemon = True
+            thread.start()
+            ready.wait()
+            return self._loop
+
+    def _run_loop(self, loop, ready):
+        asyncio.set_event_loop(loop)
+        # Created here: on Python 3.9 a semaphore binds to the loop current at construction
+        self._in_flight_limit = asyncio.Semaphore(self.max_in_flight)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def submit(self, key, coroutine_function, *args, **kwargs):
+        """Schedule ``coroutine_function(*args, **kwargs)`` on the loop and return its Job."""
+        loop = self._ensure_loop()
+        with self._lock:
+            if self._active >= self.max_jobs:
+                self._rejected += 1
+                raise QueueFull(max(1, round(self._avg_run or 1.0)))
+            self._active += 1
+        job = Job(key, coroutine_function, args, kwargs)
+        job.future = asyncio.run_coroutine_threadsafe(self._run_job(job), loop)
+        # Also fires when a job is cancelled before its coroutine ever ran
+        job.future.add_done_callback(lambda future: self._job_finished(job, future))
+        return job
+
+    async def _run_job(self, job):
+        job.status = "running"
+        job.started_at = time.monotonic()
+        try:
+            await job.target(*job.args, **job.kwargs)
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+
+    def _job_finished(self, job, future):
+        job.finished_at = time.monotonic()
+        if future.cancelled():
+            job.status = "cancelled"
+        run_time = job.finished_at - job.started_at if job.started_at is not None else 0.0
+        with self._lock:
+            self._active -= 1
+            self._completed += 1
+            self._avg_run = run_time if not self._avg_run else self._avg_run + 0.2 * (run_time - self._avg_run)
+
+    async def call(self, coroutine_function, *args):
+        """Await a provider call, holding one of the engine-wide in-flight slots."""
+        async with self._in_flight_limit:
+            with self._lock:
+                self._in_flight += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                return await coroutine_function(*args)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+    def cancel(self, job):
+        """Cancel a job's task; its awaits, including provider calls, raise CancelledError at once."""
+        return job.future.cancel()
+
+    def run(self, coroutine):
+        """Run a coroutine on the engine's loop from another thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop()).result()
+
+    def position(self, job):
+        # Jobs start as soon as they are submitted; there is no queue to wait in
+        return 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'engine': 'asyncio',
+                'max_jobs': self.max_jobs,
+                'max_in_flight': self.max_in_flight,
+                'running': self._active,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'avg_run_seconds': round(self._avg_run, 3)
+            }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Analysis Engine Benchmark
+Compares the thread-per-analysis model with the asyncio engine against the stand-in analysis server
+"""
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis_provider import HTTPProvider, AsyncHTTPProvider
+from async_engine import AsyncAnalysisEngine
+
+
+def build_documents(documents, sections, section_chars):
+    sentence = "Finding with supporting evidence, metrics and references to the relevant policy. "
+    body = (sentence * (section_chars // len(sentence) + 1))[:section_chars]
+    return [
+        [(f"Section {j} of document {i}", body, None) for j in range(sections)]
+        for i in range(documents)
+    ]
+
+
+class ThreadSampler:
+    """Records the most threads alive at once while a run is in progress."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def __enter__(self):
+        self.peak = threading.active_count()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+
+def run_threads(url, documents, workers, pool_size, concurrency):
+    """The scheduler model: ``workers`` analysis threads sharing a ``pool_size`` section pool."""
+    provider = HTTPProvider(url, pool_size=pool_size)
+    section_pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='section-analysis')
+
+    def analyze_document(sections):
+        batches = provider.plan_batches(sections)
+        # A document keeps at most ``concurrency`` calls queued on the shared pool at a time
+        for start in range(0, len(batches), concurrency):
+            list(section_pool.map(provider.analyze_batch, batches[start:start + concurrency]))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis-worker') as analysis_workers:
+        list(analysis_workers.map(analyze_document, documents))
+    section_pool.shutdown()
+    return provider.stats()
+
+
+def run_asyncio(url, documents, max_in_flight, concurrency):
+    """The asyncio model: every document is a coroutine on one event-loop thread."""
+    provider = AsyncHTTPProvider(url, pool_size=max_in_flight)
+    engine = AsyncAnalysisEngine(max_jobs=len(documents), max_in_flight=max_in_flight)
+
+    async def analyze_document(sections):
+        limit = asyncio.Semaphore(concurrency)
+
+        async def analyze(batch):
+            async with limit:
+                return await engine.call(provider.analyze_batch, batch)
+
+        await asyncio.gather(*(analyze(batch) for batch in provider.plan_batches(sections)))
+
+    async def analyze_all():
+        await asyncio.gather(*(analyze_document(sections) for sections in documents))
+
+    engine.run(analyze_all())
+    stats = provider.stats()
+    stats['peak_in_flight'] = engine.stats()['peak_in_flight']
+    return stats
+
+
+def report(label, run, total_sections):
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        stats = run()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<8} {elapsed:8.2f} s   {total_sections / elapsed:8.1f} sections/s   "
+          f"peak threads {sampler.peak:4d}   requests {stats['requests']}   "
+          f"connections {stats['connections_created']}   failures {stats['failures']}")
+
+
+def start_server(port, latency, per_section):
+    server = subprocess.Popen([
+        sys.executable, 'analysis_stub_server.py', '--port', str(port),
+        '--latency', str(latency), '--per-section', str(per_section)
+    ], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError(f"Stand-in server did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=100)
+    parser.add_argument('--sections', type=int, default=8)
+    parser.add_argument('--section-chars', type=int, default=12000, help='at the 12000-character batch limit each section is its own call')
+    parser.add_argument('--latency', type=float, default=0.5, help='stand-in seconds per provider call')
+    parser.add_argument('--per-section', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=4, help='calls in flight per document (SECTION_CONCURRENCY)')
+    parser.add_argument('--workers', type=int, default=2, help='analysis threads (ANALYSIS_WORKERS)')
+    parser.add_argument('--pool-size', type=int, default=8, help='section threads (SECTION_POOL_SIZE)')
+    parser.add_argument('--max-in-flight', type=int, default=512, help='asyncio engine cap (ASYNC_MAX_IN_FLIGHT)')
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    documents = build_documents(args.documents, args.sections, args.section_chars)
+    total_sections = args.documents * args.sections
+    url = f"http://127.0.0.1:{args.port}/analyze"
+    print(f"{args.documents} documents x {args.sections} sections, {args.latency}s per call, "
+          f"{args.concurrency} calls per document")
+
+    server = start_server(args.port, args.latency, args.per_section)
+    try:
+        report('threads', lambda: run_threads(url, documents, args.workers, args.pool_size, args.concurrency), total_sections)
+        report('asyncio', lambda: run_asyncio(url, documents, args.max_in_flight, args.concurrency), total_sections)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+DOCX Extraction Benchmark
+Compares the python-docx extractor with the streaming extractor on a generated document
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from docx import Document
+
+from analysis_pipeline import extract_document_sections_from_docx
+from docx_stream import extract_document_sections_streaming
+from heading_detector import HeadingDetector
+
+HEADINGS = ['Executive Summary', 'Background', 'Analysis', 'Methodology', 'Scope', 'Recommendation', 'Conclusion']
+
+
+def build_document(path, sections, paragraphs):
+    doc = Document()
+    for i in range(sections):
+        heading = doc.add_paragraph()
+        heading.add_run(f"{HEADINGS[i % len(HEADINGS)]} {i}:").bold = True
+        for j in range(paragraphs):
+            para = doc.add_paragraph(f"Finding {j} for section {i}: ")
+            para.add_run("emphasised detail").italic = True
+            para.add_run(" with supporting evidence, metrics and references to the relevant policy.")
+    doc.save(path)
+
+
+EXTRACTORS = {
+    'python-docx': lambda path: extract_document_sections_from_docx(Document(path), HeadingDetector()),
+    'streaming': lambda path: extract_document_sections_streaming(path),
+}
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure_in_child(extractor, path, repeat):
+    """Run in a fresh process, so peak RSS covers lxml/libxml2 memory that tracemalloc can't see."""
+    extract = EXTRACTORS[extractor]
+    baseline = peak_rss_mib()
+    sections = extract(path)
+    peak = peak_rss_mib()
+    elapsed = min(_timed(extract, path) for _ in range(repeat))
+    print(json.dumps({'elapsed': elapsed, 'peak': peak, 'growth': peak - baseline, 'sections': len(sections)}))
+
+
+def run_child(*args):
+    # A child's ru_maxrss starts from this process's RSS, so anything large happens in children
+    return subprocess.run([sys.executable, __file__, *args], check=True, capture_output=True, text=True).stdout
+
+
+def measure(extractor, path, repeat=3):
+    output = run_child('--measure', extractor, path, '--repeat', str(repeat))
+    result = json.loads(output.strip().splitlines()[-1])
+    print(f"{extractor:<12} {result['elapsed'] * 1000:9.1f} ms   peak RSS {result['peak']:8.1f} MiB "
+          f"(+{result['growth']:.1f} MiB over imports)   {result['sections']} sections")
+
+
+def _timed(extract, path):
+    start = time.perf_counter()
+    extract(path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sections', type=int, default=200)
+    parser.add_argument('--paragraphs', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--measure', nargs=2, metavar=('EXTRACTOR', 'PATH'), help=argparse.SUPPRESS)
+    parser.add_argument('--build', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure_in_child(*args.measure, args.repeat)
+        return
+    if args.build:
+        build_document(args.build, args.sections, args.paragraphs)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.docx')
+        run_child('--build', path, '--sections', str(args.sections), '--paragraphs', str(args.paragraphs))
+        print(f"Document: {args.sections} sections x {args.paragraphs} paragraphs, "
+              f"{os.path.getsize(path) / 1024:.0f} KiB on disk")
+
+        for extractor in EXTRACTORS:
+            measure(extractor, path, args.repeat)
+
+        # Compared last, once the measurements no longer depend on this process's RSS
+        baseline = EXTRACTORS['python-docx'](path)
+        streaming = EXTRACTORS['streaming'](path)
+        print(f"Identical output: {baseline == streaming and list(baseline) == list(streaming)}")
+
+
+if __name__ == '__main__':
+    main()
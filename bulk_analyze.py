@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Bulk Analysis for Enhanced Writeup Automation AI Tool
+Analyzes every .docx under the given paths offline and writes one JSON line per document
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from docx import Document
+
+from analysis_pipeline import AnalysisPipeline, extract_document_sections_from_docx, pipeline_config
+from async_engine import AsyncAnalysisEngine
+from docx_stream import extract_document_sections_streaming, extract_document_text
+
+
+def find_documents(paths):
+    """Every .docx under ``paths`` (files or directories), sorted, skipping Word's ~$ lock files."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.docx') and not name.startswith('~$'):
+                    found.append(os.path.abspath(os.path.join(root, name)))
+    return found
+
+
+def parse_document(path, extractor, detector):
+    # Runs in a worker process, so parsing uses every core while the analysis loop waits on the provider
+    if extractor == 'python-docx':
+        return extract_document_sections_from_docx(Document(path), detector)
+    return extract_document_sections_streaming(path, detector)
+
+
+def finished_documents(output):
+    """Documents already written to ``output`` without an error; failed ones are tried again."""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line of an interrupted run may be cut short
+                continue
+            if 'error' not in record:
+                done.add(record['document'])
+    return done
+
+
+def open_output(output):
+    f = open(output, 'a+', encoding='utf-8')
+    f.seek(0, os.SEEK_END)
+    if f.tell():
+        f.seek(f.tell() - 1)
+        if f.read(1) != '\n':
+            # Finish a line left incomplete by an interrupted run so the next record parses
+            f.write('\n')
+    return f
+
+
+class BulkRun:
+    """Parses documents in a process pool and analyzes their sections as coroutines on the asyncio engine.
+
+    At most ``documents`` are parsed or analyzed at once, which bounds memory
+    however large the archive; provider calls across all of them are capped
+    by the engine's ASYNC_MAX_IN_FLIGHT and the shared rate limiter.
+    """
+
+    def __init__(self, out, pipeline, documents, extractor, guidelines_content=None):
+        self.out = out
+        self.pipeline = pipeline
+        self.documents = documents
+        self.extractor = extractor
+        self.guidelines_content = guidelines_content
+        self.analyzed = 0
+        self.failed = 0
+        self.sections = 0
+        # Set once run() has unwound, including the documents an interrupt cut off
+        self.finished = threading.Event()
+
+    async def analyze_document(self, pool, path):
+        start = time.perf_counter()
+        try:
+            sections = await asyncio.get_running_loop().run_in_executor(
+                pool, parse_document, path, self.extractor, self.pipeline.heading_detector
+            )
+            planned = self.pipeline.plan_sections(sections.items(), self.guidelines_content)
+            batches = self.pipeline.async_provider.plan_batches(planned)
+            results = {}
+            for batch_results in await asyncio.gather(*(self.pipeline.analyze_sections_cached_async(batch) for batch in batches)):
+                results.update(batch_results)
+            record = {
+                'document': path,
+                'sections': len(sections),
+                'feedback_items': sum(len(result.get('feedback_items', [])) for result in results.values()),
+                'seconds': round(time.perf_counter() - start, 3),
+                # In document order, whatever order the batches finished in
+                'results': {section_name: results[section_name] for section_name in sections}
+            }
+            self.analyzed += 1
+            self.sections += len(sections)
+        except Exception as e:
+            record = {'document': path, 'error': str(e)}
+            self.failed += 1
+        self.out.write(json.dumps(record) + '\n')
+        self.out.flush()
+
+    async def run(self, pool, paths):
+        slots = asyncio.Semaphore(self.documents)
+        tasks = set()
+
+        async def analyze(path):
+            try:
+                await self.analyze_document(pool, path)
+            finally:
+                slots.release()
+
+        try:
+            for path in paths:
+                await slots.acquire()
+                task = asyncio.ensure_future(analyze(path))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            # Documents cut off by an interrupt write nothing and are picked up by the next run
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.finished.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('paths', nargs='+', help='.docx files or directories to search')
+    parser.add_argument('--output', default='analysis_results.jsonl', help='appended to; documents already in it are skipped')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='document parsing processes')
+    parser.add_argument('--documents', type=int, default=64, help='documents parsed or analyzed at once')
+    parser.add_argument('--extractor', choices=('streaming', 'python-docx'), default='streaming')
+    parser.add_argument('--guidelines', help='.docx guidelines applied to every document')
+    parser.add_argument('--restart', action='store_true', help='ignore earlier results in --output')
+    args = parser.parse_args()
+
+    paths = find_documents(args.paths)
+    done = set() if args.restart else finished_documents(args.output)
+    todo = [path for path in paths if path not in done]
+    print(f"{len(paths)} documents found, {len(paths) - len(todo)} already analyzed, {len(todo)} to go")
+
+    guidelines_content = extract_document_text(args.guidelines) if args.guidelines else None
+
+    config = pipeline_config()
+    engine = AsyncAnalysisEngine(max_jobs=1, max_in_flight=config['ASYNC_MAX_IN_FLIGHT'])
+    pipeline = AnalysisPipeline(config, engine)
+
+    # Spawned, not forked: workers start on first use, from the engine's loop thread, and a
+    # fork there would copy whatever locks the loop and provider threads hold at that moment
+    pool = ProcessPoolExecutor(max_workers=args.processes, mp_context=multiprocessing.get_context('spawn'))
+    with pool, (open(args.output, 'w', encoding='utf-8') if args.restart else open_output(args.output)) as out:
+        run = BulkRun(out, pipeline, args.documents, args.extractor, guidelines_content)
+        start = time.perf_counter()
+        job = engine.submit('bulk', run.run, pool, todo)
+        try:
+            job.future.result()
+        except KeyboardInterrupt:
+            engine.cancel(job)
+            # The cancel lands on the loop thread; let the documents in flight unwind before out closes
+            run.finished.wait()
+            print("Interrupted - run again with the same --output to resume", file=sys.stderr)
+        # job.status is set on the loop thread, so read it only once the job's future has settled
+        wait([job.future])
+        if job.status == "failed":
+            print(f"Bulk run failed: {job.error}", file=sys.stderr)
+        elapsed = time.perf_counter() - start
+
+    print(f"{run.analyzed} documents ({run.sections} sections) analyzed, {run.failed} failed in {elapsed:.1f} s   "
+          f"{run.analyzed / elapsed:.2f} docs/s   {run.sections / elapsed:.1f} sections/s")
+    print(f"Provider: {pipeline.async_provider.stats()}   cache: {pipeline.cache.stats()}")
+    return 1 if run.failed or job.status != "done" else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
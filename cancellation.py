@@ -0,0 +1,71 @@
+"""
+Cancellation for Enhanced Writeup Automation AI Tool
+Per-job cancel tokens that abort waits and in-flight provider calls as soon as a job is stopped
+"""
+
+import threading
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Set once when a job is stopped; everything working for the job watches it.
+
+    Blocking waits go through ``sleep``/``wait`` so they return at once on
+    cancellation, and code holding something that can't watch the token (a
+    socket mid-read, a future in a pool) registers an ``on_cancel`` callback
+    that aborts it.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason='cancelled'):
+        """Cancel the token and run its callbacks; returns False if it was already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+        return True
+
+    def on_cancel(self, callback):
+        """Run ``callback`` on cancellation (at once if already cancelled); returns it for ``remove``."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return callback
+        callback()
+        return callback
+
+    def remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait(self, timeout=None):
+        """True once cancelled, False if ``timeout`` passed first."""
+        return self._event.wait(timeout)
+
+    def sleep(self, seconds):
+        if self._event.wait(seconds):
+            raise Cancelled(self.reason)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
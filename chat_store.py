@@ -0,0 +1,118 @@
+"""
+Chat History Store for Enhanced Writeup Automation AI Tool
+Compact per-session chat turns with shared, interned context snapshots
+"""
+
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+
+
+class ContextSnapshot:
+    __slots__ = ('fields', '__weakref__')
+
+    def __init__(self, fields):
+        self.fields = fields
+
+
+# Identical contexts across turns and sessions resolve to one snapshot object
+_snapshots = weakref.WeakValueDictionary()
+_snapshots_lock = threading.Lock()
+
+
+def _intern_value(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def intern_context(context):
+    key = tuple(sorted((sys.intern(name), _intern_value(value)) for name, value in context.items()))
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = ContextSnapshot(dict(key))
+            _snapshots[key] = snapshot
+        return snapshot
+
+
+class ChatTurn:
+    __slots__ = ('seq', 'created_at', 'user_message', 'ai_response', 'context', 'llm_used')
+
+    def __init__(self, seq, user_message, ai_response, context, llm_used):
+        self.seq = seq
+        self.created_at = time.time()
+        self.user_message = user_message
+        # Canned responses repeat verbatim, so interning shares them between turns
+        self.ai_response = sys.intern(ai_response)
+        self.context = context
+        self.llm_used = sys.intern(llm_used)
+
+    def to_dict(self, include_context=True):
+        entry = {
+            'id': f"chat_{self.seq}",
+            'seq': self.seq,
+            'timestamp': datetime.fromtimestamp(self.created_at).isoformat(),
+            'user_message': self.user_message,
+            'ai_response': self.ai_response,
+            'llm_used': self.llm_used
+        }
+        if include_context:
+            entry['context'] = dict(self.context.fields)
+        return entry
+
+
+class ChatHistory:
+    """Bounded chat history for one session.
+
+    Keeps at most ``max_turns`` turns, and drops turns older than
+    ``max_age`` seconds when ``max_age`` is set.
+    """
+
+    def __init__(self, max_turns=200, max_age=None):
+        self.max_turns = max_turns
+        self.max_age = max_age
+        self._turns = deque()
+        self._last_seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._turns)
+
+    def append(self, user_message, ai_response, context, llm_used):
+        snapshot = intern_context(context)
+        with self._lock:
+            self._last_seq += 1
+            turn = ChatTurn(self._last_seq, user_message, ai_response, snapshot, llm_used)
+            self._turns.append(turn)
+            self._prune_locked()
+            return turn
+
+    def page(self, before=None, limit=20):
+        """Up to ``limit`` turns older than seq ``before`` (newest when omitted), oldest first."""
+        with self._lock:
+            self._prune_locked()
+            turns = [turn for turn in self._turns if before is None or turn.seq < before]
+            total = len(self._turns)
+        page = turns[-limit:] if limit else turns
+        has_more = len(turns) > len(page)
+        return {
+            'turns': [turn.to_dict() for turn in page],
+            'total': total,
+            'next_before': page[0].seq if page and has_more else None
+        }
+
+    def entries(self):
+        with self._lock:
+            self._prune_locked()
+            return [turn.to_dict() for turn in self._turns]
+
+    def _prune_locked(self):
+        while len(self._turns) > self.max_turns:
+            self._turns.popleft()
+        if self.max_age:
+            cutoff = time.time() - self.max_age
+            while self._turns and self._turns[0].created_at < cutoff:
+                self._turns.popleft()
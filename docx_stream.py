@@ -0,0 +1,168 @@
+"""
+Streaming DOCX Section Extractor for Enhanced Writeup Automation AI Tool
+Reads word/document.xml incrementally instead of building a python-docx object graph
+"""
+
+import zipfile
+from xml.etree import ElementTree
+
+from heading_detector import DEFAULT_DETECTOR
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = W_NS + 'body'
+W_P = W_NS + 'p'
+W_R = W_NS + 'r'
+W_T = W_NS + 't'
+W_TAB = W_NS + 'tab'
+W_BR = W_NS + 'br'
+W_CR = W_NS + 'cr'
+W_RPR = W_NS + 'rPr'
+W_B = W_NS + 'b'
+W_PPR = W_NS + 'pPr'
+W_PSTYLE = W_NS + 'pStyle'
+W_OUTLINE_LVL = W_NS + 'outlineLvl'
+W_VAL = W_NS + 'val'
+W_STYLE = W_NS + 'style'
+W_STYLE_ID = W_NS + 'styleId'
+W_NAME = W_NS + 'name'
+W_BASED_ON = W_NS + 'basedOn'
+
+
+def outline_level(element):
+    """Outline level set directly on a paragraph or style element, or None."""
+    level = element.find(f'{W_PPR}/{W_OUTLINE_LVL}')
+    if level is None:
+        return None
+    try:
+        return int(level.get(W_VAL))
+    except (TypeError, ValueError):
+        return None
+
+
+def read_paragraph_styles(archive):
+    """Map style id -> (style name, outline level) from word/styles.xml, following basedOn."""
+    try:
+        with archive.open('word/styles.xml') as xml:
+            root = ElementTree.parse(xml).getroot()
+    except KeyError:
+        return {}
+
+    raw = {}
+    for style in root.iter(W_STYLE):
+        style_id = style.get(W_STYLE_ID)
+        if style_id is None:
+            continue
+        name = style.find(W_NAME)
+        based_on = style.find(W_BASED_ON)
+        raw[style_id] = (
+            name.get(W_VAL) if name is not None else style_id,
+            outline_level(style),
+            based_on.get(W_VAL) if based_on is not None else None
+        )
+
+    styles = {}
+    for style_id, (name, level, parent) in raw.items():
+        # Inherit the outline level along the basedOn chain, guarding against cycles
+        seen = {style_id}
+        while level is None and parent in raw and parent not in seen:
+            seen.add(parent)
+            _name, level, parent = raw[parent]
+        styles[style_id] = (name, level)
+    return styles
+
+
+def _run_is_bold(run):
+    bold = run.find(f'{W_RPR}/{W_B}')
+    if bold is None:
+        return False
+    return bold.get(W_VAL, 'true') in ('1', 'true', 'on')
+
+
+def _paragraph(p):
+    # Mirrors python-docx: only direct <w:r> children contribute text
+    parts = []
+    is_bold = False
+    for run in p:
+        if run.tag != W_R:
+            continue
+        if not is_bold and _run_is_bold(run):
+            is_bold = True
+        for child in run:
+            if child.tag == W_T:
+                parts.append(child.text or '')
+            elif child.tag == W_TAB:
+                parts.append('\t')
+            elif child.tag in (W_BR, W_CR):
+                parts.append('\n')
+    ppr = p.find(W_PPR)
+    if ppr is None:
+        return ''.join(parts), is_bold, None, None
+    style = ppr.find(W_PSTYLE)
+    level = ppr.find(W_OUTLINE_LVL)
+    return (
+        ''.join(parts), is_bold,
+        style.get(W_VAL) if style is not None else None,
+        int(level.get(W_VAL)) if level is not None and (level.get(W_VAL) or '').isdigit() else None
+    )
+
+
+def iter_paragraphs(source):
+    """Yield (text, is_bold, style_name, outline_level) for each top-level body paragraph.
+
+    ``source`` is a path or a seekable binary file object. Each body-level
+    element is detached once parsed, so memory stays bounded by the largest
+    single paragraph or table rather than the whole document. The outline
+    level is the paragraph's own, else its style's, else None.
+    """
+    with zipfile.ZipFile(source) as archive:
+        styles = read_paragraph_styles(archive)
+        with archive.open('word/document.xml') as xml:
+            # <w:document> is depth 1, <w:body> depth 2, paragraphs depth 3
+            depth = 0
+            body = None
+            for event, elem in ElementTree.iterparse(xml, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2:
+                        body = elem if elem.tag == W_BODY else None
+                    continue
+                depth -= 1
+                if depth != 2 or body is None:
+                    continue
+                if elem.tag == W_P:
+                    text, is_bold, style_id, level = _paragraph(elem)
+                    style_name, style_level = styles.get(style_id, (style_id, None))
+                    yield text, is_bold, style_name, level if level is not None else style_level
+                body.remove(elem)
+
+
+def iter_document_sections(source, detector=None):
+    """Yield (section_name, content) pairs in document order."""
+    detector = detector or DEFAULT_DETECTOR
+    current_section = "Executive Summary"
+    content = []
+
+    for text, is_bold, style_name, level in iter_paragraphs(source):
+        text = text.strip()
+        if not text:
+            continue
+        if detector.is_heading(text, is_bold, style_name, level):
+            if content:
+                yield current_section, '\n'.join(content)
+            current_section = text.rstrip(':')
+            content = []
+        else:
+            content.append(text)
+
+    if content:
+        yield current_section, '\n'.join(content)
+
+
+def extract_document_sections_streaming(source, detector=None):
+    # dict() keeps first-seen order and last-seen content, like the python-docx extractor
+    return dict(iter_document_sections(source, detector))
+
+
+def extract_document_text(source):
+    # Same as joining python-docx paragraph texts, skipping blank paragraphs
+    return '\n'.join(paragraph[0] for paragraph in iter_paragraphs(source) if paragraph[0].strip())
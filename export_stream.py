@@ -0,0 +1,125 @@
+"""
+Streaming Export for Enhanced Writeup Automation AI Tool
+Generates session exports chunk by chunk as JSON or NDJSON, optionally gzip or deflate compressed
+"""
+
+import json
+import zlib
+
+from response_compression import ENCODING_WBITS
+
+EXPORT_FIELDS = ('user_feedback', 'accepted_feedback', 'rejected_feedback')
+
+
+def _section_parts(session, section_name):
+    # Hold the session lock only long enough to take references for one section
+    with session.lock:
+        feedback = {'user_feedback': list(session.user_feedback.get(section_name, []))}
+        # Accepted / rejected are exported as feedback ids, in the section's item order
+        feedback.update(session.section_decisions(section_name))
+        return (
+            session.sections.get(section_name, ''),
+            session.analysis_results.get(section_name),
+            feedback
+        )
+
+
+def _section_names(session):
+    with session.lock:
+        return list(session.sections)
+
+
+def _json_object(pairs):
+    """Yield a JSON object from (key, value) pairs without building it in memory."""
+    yield '{'
+    first = True
+    for key, value in pairs:
+        yield ('' if first else ',') + json.dumps(key) + ':' + json.dumps(value)
+        first = False
+    yield '}'
+
+
+def _json_array(items):
+    yield '['
+    first = True
+    for item in items:
+        yield ('' if first else ',') + json.dumps(item)
+        first = False
+    yield ']'
+
+
+def iter_export_json(session, metadata):
+    """Yield the classic export document (same keys as before) one section at a time."""
+    names = _section_names(session)
+
+    yield '{"session_metadata":' + json.dumps(metadata)
+
+    yield ',"document_sections":'
+    yield from _json_object((name, _section_parts(session, name)[0]) for name in names)
+
+    yield ',"analysis_results":'
+    yield from _json_object(
+        (name, result) for name, result in ((name, _section_parts(session, name)[1]) for name in names)
+        if result is not None
+    )
+
+    for field in EXPORT_FIELDS:
+        yield f',"{field}":'
+        yield from _json_object(
+            (name, items) for name, items in ((name, _section_parts(session, name)[2][field]) for name in names)
+            if items
+        )
+
+    yield ',"chat_history":'
+    yield from _json_array(session.chat_history.entries())
+    yield ',"analysis_logs":'
+    yield from _json_array(session.activity_log.entries())
+    yield '}'
+
+
+def iter_export_ndjson(session, metadata):
+    """Yield one JSON record per line: metadata, then one record per section, chat turn and log entry."""
+    yield json.dumps({'type': 'session_metadata', **metadata}) + '\n'
+
+    for name in _section_names(session):
+        content, result, feedback = _section_parts(session, name)
+        record = {'type': 'section', 'name': name, 'content': content, 'analysis': result}
+        record.update(feedback)
+        yield json.dumps(record) + '\n'
+
+    for entry in session.chat_history.entries():
+        yield json.dumps({'type': 'chat', **entry}) + '\n'
+    for entry in session.activity_log.entries():
+        yield json.dumps({'type': 'log', **entry}) + '\n'
+
+
+def compress_chunks(chunks, encoding='gzip', level=6, min_chunk=64 * 1024):
+    """Gzip or deflate a stream of str chunks, emitting output roughly every ``min_chunk`` input bytes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODING_WBITS[encoding])
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= min_chunk:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def encode_chunks(chunks, min_chunk=64 * 1024):
+    """Encode str chunks, coalescing them into writes of roughly ``min_chunk`` bytes."""
+    buffer = []
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        pending += len(data)
+        if pending >= min_chunk:
+            yield b''.join(buffer)
+            buffer = []
+            pending = 0
+    if buffer:
+        yield b''.join(buffer)
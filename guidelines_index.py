@@ -0,0 +1,138 @@
+"""
+Guidelines Index for Enhanced Writeup Automation AI Tool
+Splits guideline documents into clauses and retrieves the few relevant to a section
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from heading_detector import SECTION_KEYWORDS
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# "1.", "1.2.3", "a)", "(iv)", bullets - a new numbered item always starts a new clause
+CLAUSE_START_RE = re.compile(r'^\s*(?:\(?\d+(?:\.\d+)*[.)]?|\(?[a-z][.)]|\(?[ivx]+[.)]|[-*•])\s+', re.IGNORECASE)
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+STOPWORDS = frozenset("""
+a an and are as at be been by can for from has have if in into is it its may must not of on or
+shall should such that the their there these this those to was were which will with within without
+""".split())
+
+MAX_CLAUSE_CHARS = 600
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Added to a clause's score when it is tagged for the section's type
+TAG_BOOST = 1.5
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if len(token) < 3 or token in STOPWORDS:
+            continue
+        # Light plural folding so "risks" matches "risk"
+        if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def section_tags(text):
+    lowered = text.lower()
+    return frozenset(keyword for keyword in SECTION_KEYWORDS if keyword in lowered)
+
+
+def _is_heading(line):
+    return len(line) < 80 and not line.endswith(('.', ';', ':', ',')) and not CLAUSE_START_RE.match(line)
+
+
+def split_clauses(text):
+    """Split guideline text into (heading, clause) pairs.
+
+    Each non-blank line is a clause; short unpunctuated lines are treated as
+    headings and carried onto the clauses beneath them. Long paragraphs are
+    cut at sentence boundaries into pieces of about ``MAX_CLAUSE_CHARS``.
+    """
+    heading = ''
+    clauses = []
+    for line in (text or '').split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if _is_heading(line):
+            heading = line
+            continue
+        if len(line) <= MAX_CLAUSE_CHARS:
+            clauses.append((heading, line))
+            continue
+        piece = ''
+        for sentence in SENTENCE_END_RE.split(line):
+            if piece and len(piece) + len(sentence) + 1 > MAX_CLAUSE_CHARS:
+                clauses.append((heading, piece))
+                piece = sentence
+            else:
+                piece = f"{piece} {sentence}" if piece else sentence
+        if piece:
+            clauses.append((heading, piece))
+    return clauses
+
+
+class GuidelinesIndex:
+    """Inverted index over guideline clauses, scored with BM25 plus a section-type boost."""
+
+    def __init__(self, clauses):
+        self.clauses = [clause for _heading, clause in clauses]
+        self.tags = []
+        self.postings = defaultdict(list)
+        lengths = []
+        for position, (heading, clause) in enumerate(clauses):
+            # Headings are indexed with their clauses: "Risk Assessment" tags everything below it
+            terms = Counter(tokenize(f"{heading} {clause}"))
+            for term, count in terms.items():
+                self.postings[term].append((position, count))
+            lengths.append(sum(terms.values()))
+            self.tags.append(section_tags(f"{heading} {clause}"))
+        self.lengths = lengths
+        self.average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def top_k(self, section_name, section_content, k=5):
+        """The ``k`` best clauses for a section, returned in document order."""
+        if not self.clauses or k <= 0:
+            return []
+
+        query = Counter(tokenize(f"{section_name} {section_content}"))
+        total = len(self.clauses)
+        scores = defaultdict(float)
+        for term in query:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                norm = K1 * (1 - B + B * self.lengths[position] / (self.average_length or 1))
+                scores[position] += idf * count * (K1 + 1) / (count + norm)
+
+        wanted = section_tags(section_name)
+        if wanted:
+            for position, tags in enumerate(self.tags):
+                if tags & wanted:
+                    scores[position] += TAG_BOOST
+
+        best = sorted(scores, key=lambda position: (-scores[position], position))[:k]
+        return [self.clauses[position] for position in sorted(best)]
+
+    def stats(self):
+        return {
+            'clauses': len(self.clauses),
+            'terms': len(self.postings),
+            'tagged_clauses': sum(1 for tags in self.tags if tags)
+        }
+
+
+def build_guidelines_index(text):
+    return GuidelinesIndex(split_clauses(text))
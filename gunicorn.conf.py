@@ -7,7 +7,14 @@ backlog = 2048
 
 # Worker processes
 workers = 2
-worker_class = "sync"
+# Threaded workers so long-lived /api/status/stream connections don't pin a whole worker.
+# Every open tab holds one thread for its status stream (or a long-poll of up to 25s),
+# so workers x threads is about how many tabs the box can follow at once. Size
+# GUNICORN_THREADS for the expected number of open tabs plus headroom; MAX_HELD_REQUESTS
+# (below) keeps 16 threads per worker free for uploads and API calls, and tabs beyond
+# the limit fall back to plain polling every 2s.
+worker_class = "gthread"
+threads = int(os.environ.get('GUNICORN_THREADS', 64))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -24,6 +31,12 @@ loglevel = "info"
 # Process naming
 proc_name = "writeup-ai-tool"
 
+# Share session state between workers so any worker can serve any poll
+raw_env = [
+    f"SESSION_STORE={os.environ.get('SESSION_STORE', 'sqlite')}",
+    f"MAX_HELD_REQUESTS={os.environ.get('MAX_HELD_REQUESTS', max(1, threads - 16))}",
+]
+
 # Server mechanics
 preload_app = True
 daemon = False
@@ -34,4 +47,12 @@ tmp_upload_dir = None
 
 # SSL (if needed)
 # keyfile = None
-# certfile = None
\ No newline at end of file
+# certfile = None
+
+
+# Server hooks
+def worker_exit(server, worker):
+    # Let the surviving workers resume this worker's running analyses at once
+    monitor = getattr(worker.wsgi, 'extensions', {}).get('journal_monitor')
+    if monitor is not None:
+        monitor.hand_off()
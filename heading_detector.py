@@ -0,0 +1,48 @@
+"""
+Heading Detector for Enhanced Writeup Automation AI Tool
+Decides which paragraphs start a new section, from Word styles first and bold keywords second
+"""
+
+import re
+
+SECTION_KEYWORDS = ['summary', 'background', 'analysis', 'recommendation', 'conclusion', 'objective', 'scope', 'methodology']
+
+# Matches style names ("Heading 2") and the usual style ids ("Heading2")
+HEADING_STYLE_RE = re.compile(r'heading\s*\d+$', re.IGNORECASE)
+
+# Word outline levels run 0-8; 9 means body text
+BODY_OUTLINE_LEVEL = 9
+
+
+class HeadingDetector:
+    """Classifies paragraphs as section headings.
+
+    A paragraph is a heading when its style is ``Heading N`` or it has an
+    outline level, or else when it is short, bold and contains one of
+    ``keywords``. The keywords are compiled into a single case-insensitive
+    regex, so the fallback costs one search rather than one scan per keyword.
+    """
+
+    def __init__(self, keywords=SECTION_KEYWORDS, max_length=100):
+        self.keywords = tuple(keyword.strip() for keyword in keywords if keyword.strip())
+        self.max_length = max_length
+        # Longest first, so overlapping keywords resolve to the most specific one
+        pattern = '|'.join(re.escape(keyword) for keyword in sorted(self.keywords, key=len, reverse=True))
+        self._keyword_re = re.compile(pattern, re.IGNORECASE) if pattern else None
+
+    def is_heading(self, text, is_bold, style_name=None, outline_level=None):
+        """``is_bold`` may be a bool or a callable; it is only evaluated when a keyword matches."""
+        if outline_level is not None and outline_level < BODY_OUTLINE_LEVEL:
+            return True
+        if style_name and HEADING_STYLE_RE.match(style_name):
+            return True
+        if len(text) >= self.max_length or self._keyword_re is None or not self._keyword_re.search(text):
+            return False
+        return is_bold() if callable(is_bold) else bool(is_bold)
+
+
+DEFAULT_DETECTOR = HeadingDetector()
+
+
+def is_section_heading(text, is_bold):
+    return DEFAULT_DETECTOR.is_heading(text, is_bold)
@@ -0,0 +1,344 @@
+"""
+Job Journal for Enhanced Writeup Automation AI Tool
+Records running analyses and their finished sections so another worker can resume an orphaned one
+"""
+
+import atexit
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+
+def process_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class MemoryJobJournal:
+    """Journal for a single process; nothing survives it, so nothing is ever orphaned."""
+
+    shared = False
+
+    def __init__(self):
+        self._jobs = {}
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+
+    def start(self, analysis_id, session_id, owner):
+        now = time.time()
+        with self._lock:
+            self._jobs[analysis_id] = {
+                'session_id': session_id, 'status': 'running', 'owner': owner,
+                'heartbeat': now, 'attempts': 1, 'updated_at': now
+            }
+
+    def checkpoint(self, analysis_id, section_name):
+        with self._lock:
+            self._checkpoints.setdefault(analysis_id, set()).add(section_name)
+
+    def completed_sections(self, analysis_id):
+        with self._lock:
+            return set(self._checkpoints.get(analysis_id, ()))
+
+    def finish(self, analysis_id, status):
+        with self._lock:
+            job = self._jobs.get(analysis_id)
+            if job is None or job['status'] != 'running':
+                return False
+            job['status'] = status
+            job['updated_at'] = time.time()
+            return True
+
+    def running(self, analysis_id):
+        with self._lock:
+            job = self._jobs.get(analysis_id)
+            return job is not None and job['status'] == 'running'
+
+    def heartbeat(self, owner):
+        now = time.time()
+        with self._lock:
+            for job in self._jobs.values():
+                if job['owner'] == owner and job['status'] == 'running':
+                    job['heartbeat'] = now
+
+    def release(self, owner, analysis_id=None):
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job['owner'] == owner and job['status'] == 'running' and analysis_id in (None, job_id):
+                    job['heartbeat'] = 0.0
+
+    def finished_among(self, analysis_ids):
+        with self._lock:
+            return [job_id for job_id in analysis_ids
+                    if job_id in self._jobs and self._jobs[job_id]['status'] != 'running']
+
+    def claim_orphans(self, owner, orphan_timeout):
+        cutoff = time.time() - orphan_timeout
+        claimed = []
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job['status'] == 'running' and job['heartbeat'] < cutoff:
+                    job.update(owner=owner, heartbeat=time.time(), attempts=job['attempts'] + 1)
+                    claimed.append((job_id, job['session_id']))
+        return claimed
+
+    def expire(self, max_age):
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [job_id for job_id, job in self._jobs.items()
+                     if job['status'] != 'running' and job['updated_at'] < cutoff]
+            for job_id in stale:
+                del self._jobs[job_id]
+                self._checkpoints.pop(job_id, None)
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job['status']] = statuses.get(job['status'], 0) + 1
+            return {'shared': self.shared, 'jobs': statuses}
+
+
+class SQLiteJobJournal:
+    """Journal in a SQLite file shared by every worker on the node.
+
+    A job row names the worker that owns it and the last time that worker
+    heartbeated; a checkpoint row is written once a section's result is in
+    the session store. A job still marked running whose heartbeat has gone
+    stale belongs to a dead worker and may be claimed by any other.
+    """
+
+    shared = True
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connect().executescript("""
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                analysis_id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                heartbeat REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS analysis_jobs_status ON analysis_jobs (status, heartbeat);
+            CREATE TABLE IF NOT EXISTS analysis_checkpoints (
+                analysis_id TEXT NOT NULL,
+                section_name TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (analysis_id, section_name)
+            );
+        """)
+
+    def _connect(self):
+        # Connections must not cross a fork (preload_app) or be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def start(self, analysis_id, session_id, owner):
+        now = time.time()
+        self._connect().execute(
+            'INSERT OR REPLACE INTO analysis_jobs '
+            '(analysis_id, session_id, status, owner, heartbeat, attempts, updated_at) '
+            "VALUES (?, ?, 'running', ?, ?, 1, ?)",
+            (analysis_id, session_id, owner, now, now)
+        )
+
+    def checkpoint(self, analysis_id, section_name):
+        self._connect().execute(
+            'INSERT OR REPLACE INTO analysis_checkpoints (analysis_id, section_name, completed_at) VALUES (?, ?, ?)',
+            (analysis_id, section_name, time.time())
+        )
+
+    def completed_sections(self, analysis_id):
+        rows = self._connect().execute(
+            'SELECT section_name FROM analysis_checkpoints WHERE analysis_id = ?', (analysis_id,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def finish(self, analysis_id, status):
+        """End a running job with ``status``; False if it had already ended, so the first outcome sticks."""
+        return self._connect().execute(
+            "UPDATE analysis_jobs SET status = ?, updated_at = ? WHERE analysis_id = ? AND status = 'running'",
+            (status, time.time(), analysis_id)
+        ).rowcount == 1
+
+    def running(self, analysis_id):
+        row = self._connect().execute(
+            'SELECT status FROM analysis_jobs WHERE analysis_id = ?', (analysis_id,)
+        ).fetchone()
+        return row is not None and row[0] == 'running'
+
+    def heartbeat(self, owner):
+        self._connect().execute(
+            "UPDATE analysis_jobs SET heartbeat = ? WHERE owner = ? AND status = 'running'",
+            (time.time(), owner)
+        )
+
+    def release(self, owner, analysis_id=None):
+        """Make this owner's running jobs (or just ``analysis_id``) claimable at once."""
+        query = "UPDATE analysis_jobs SET heartbeat = 0 WHERE owner = ? AND status = 'running'"
+        params = (owner,)
+        if analysis_id is not None:
+            query += ' AND analysis_id = ?'
+            params += (analysis_id,)
+        self._connect().execute(query, params)
+
+    def finished_among(self, analysis_ids):
+        placeholders = ','.join('?' * len(analysis_ids))
+        rows = self._connect().execute(
+            f"SELECT analysis_id FROM analysis_jobs WHERE analysis_id IN ({placeholders}) AND status != 'running'",
+            list(analysis_ids)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim_orphans(self, owner, orphan_timeout):
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            orphans = conn.execute(
+                "SELECT analysis_id, session_id FROM analysis_jobs WHERE status = 'running' AND heartbeat < ?",
+                (now - orphan_timeout,)
+            ).fetchall()
+            conn.executemany(
+                'UPDATE analysis_jobs SET owner = ?, heartbeat = ?, attempts = attempts + 1 WHERE analysis_id = ?',
+                [(owner, now, analysis_id) for analysis_id, _session_id in orphans]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return orphans
+
+    def expire(self, max_age):
+        conn = self._connect()
+        cutoff = time.time() - max_age
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'DELETE FROM analysis_checkpoints WHERE analysis_id IN '
+                "(SELECT analysis_id FROM analysis_jobs WHERE status != 'running' AND updated_at < ?)",
+                (cutoff,)
+            )
+            removed = conn.execute(
+                "DELETE FROM analysis_jobs WHERE status != 'running' AND updated_at < ?", (cutoff,)
+            ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return removed
+
+    def stats(self):
+        rows = self._connect().execute('SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status').fetchall()
+        return {'shared': self.shared, 'jobs': dict(rows)}
+
+
+class JournalMonitor:
+    """Per-process thread that keeps this worker's journal entries alive and adopts orphaned ones.
+
+    Every ``interval`` seconds it heartbeats the jobs this process owns,
+    cancels any of them that were stopped through another worker, and claims
+    jobs whose owner has been silent for ``orphan_timeout`` seconds, passing
+    each to ``resume(analysis_id, session_id)``. When a worker exits cleanly
+    (gunicorn's ``worker_exit`` hook, with atexit as a fallback) it hands its
+    jobs off so the survivors pick them up on their next tick rather than
+    after the timeout.
+    """
+
+    def __init__(self, journal, resume, interval=5, orphan_timeout=30, retention=24 * 3600):
+        self.journal = journal
+        self.resume = resume
+        self.interval = interval
+        self.orphan_timeout = orphan_timeout
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._tracked = {}
+        self._pid = None
+        self._last_expire = 0.0
+        self._resumed = 0
+        # Set once this process is handing its jobs off; analyses failing after that are not failures
+        self.exiting = False
+
+    def ensure_running(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._tracked = {}
+            thread = threading.Thread(target=self._run, name='job-journal-monitor')
+            thread.daemon = True
+            thread.start()
+            atexit.register(self.hand_off)
+
+    def hand_off(self):
+        """Release this process's running jobs for immediate resumption elsewhere."""
+        self.exiting = True
+        self.journal.release(process_owner())
+
+    def track(self, analysis_id, cancel_token):
+        self.ensure_running()
+        with self._lock:
+            self._tracked[analysis_id] = cancel_token
+
+    def untrack(self, analysis_id):
+        with self._lock:
+            self._tracked.pop(analysis_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.tick()
+            except Exception:
+                # A busy database or a failed resume must not kill the monitor
+                pass
+
+    def tick(self):
+        owner = process_owner()
+        self.journal.heartbeat(owner)
+
+        with self._lock:
+            tracked = dict(self._tracked)
+        if tracked:
+            for analysis_id in self.journal.finished_among(list(tracked)):
+                tracked[analysis_id].cancel("Analysis stopped on another worker")
+                self.untrack(analysis_id)
+
+        for analysis_id, session_id in self.journal.claim_orphans(owner, self.orphan_timeout):
+            self._resumed += 1
+            self.resume(analysis_id, session_id)
+
+        if time.time() - self._last_expire > 3600:
+            self._last_expire = time.time()
+            self.journal.expire(self.retention)
+
+    def stats(self):
+        stats = self.journal.stats()
+        with self._lock:
+            stats.update({'tracked_here': len(self._tracked), 'resumed_here': self._resumed})
+        return stats
+
+
+def create_job_journal(backend='memory', path=None):
+    if backend == 'memory':
+        return MemoryJobJournal()
+    if backend == 'sqlite':
+        return SQLiteJobJournal(path)
+    raise ValueError(f"Unknown job journal backend: {backend}")
@@ -0,0 +1,164 @@
+"""
+Job Scheduler for Enhanced Writeup Automation AI Tool
+Fixed worker pool with a bounded queue, round-robin across sessions
+"""
+
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Analysis queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    def __init__(self, key, target, args=(), kwargs=None):
+        self.job_id = f"job_{uuid.uuid4().hex[:8]}"
+        self.key = key
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.status = "queued"
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def wait_time(self):
+        end = self.started_at if self.started_at is not None else time.monotonic()
+        return end - self.submitted_at
+
+
+class JobScheduler:
+    """Runs jobs on ``workers`` threads, holding at most ``max_queue`` waiting jobs.
+
+    Waiting jobs are grouped by key (the session id) and workers take one job
+    per key in turn, so a session that queues many jobs cannot starve others.
+    Worker threads are started lazily in the process that first submits,
+    which keeps the pool intact when gunicorn forks a preloaded app.
+    """
+
+    def __init__(self, workers=2, max_queue=32):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queues = OrderedDict()
+        self._depth = 0
+        self._running = 0
+        self._cond = threading.Condition()
+        self._threads = []
+        self._pid = None
+        self._completed = 0
+        self._rejected = 0
+        self._avg_wait = 0.0
+        self._avg_run = 0.0
+
+    def submit(self, key, target, *args, **kwargs):
+        with self._cond:
+            self._ensure_workers()
+            if self._depth >= self.max_queue:
+                self._rejected += 1
+                raise QueueFull(self._retry_after_locked())
+            job = Job(key, target, args, kwargs)
+            self._queues.setdefault(key, deque()).append(job)
+            self._depth += 1
+            self._cond.notify()
+            return job
+
+    def position(self, job):
+        """1-based position of a queued job in dispatch order, or 0 once it has started."""
+        with self._cond:
+            if job.status != "queued":
+                return 0
+            # Round-robin dispatch takes one job from each key per pass
+            index = self._queues[job.key].index(job)
+            own_rank = list(self._queues).index(job.key)
+            ahead = 0
+            for rank, queue in enumerate(self._queues.values()):
+                ahead += min(len(queue), index + 1 if rank < own_rank else index)
+            return ahead + 1
+
+    def cancel(self, job):
+        """Drop a job that has not started yet, freeing its queue slot; False once it is running."""
+        with self._cond:
+            if job.status != "queued":
+                return False
+            queue = self._queues[job.key]
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.key]
+            self._depth -= 1
+            job.status = "cancelled"
+            job.finished_at = time.monotonic()
+            return True
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._depth,
+                'running': self._running,
+                'queued_sessions': len(self._queues),
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_wait_seconds': round(self._avg_wait, 3),
+                'avg_run_seconds': round(self._avg_run, 3)
+            }
+
+    def _ensure_workers(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{index}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job_locked(self):
+        key, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        if queue:
+            self._queues.move_to_end(key)
+        else:
+            del self._queues[key]
+        self._depth -= 1
+        return job
+
+    def _retry_after_locked(self):
+        per_job = self._avg_run or 1.0
+        return max(1, math.ceil(per_job * (self._depth + self._running) / self.workers))
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._depth:
+                    self._cond.wait()
+                job = self._next_job_locked()
+                job.status = "running"
+                job.started_at = time.monotonic()
+                self._running += 1
+                self._avg_wait = self._ewma(self._avg_wait, job.wait_time)
+            try:
+                job.target(*job.args, **job.kwargs)
+                job.status = "done"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.monotonic()
+                with self._cond:
+                    self._running -= 1
+                    self._completed += 1
+                    self._avg_run = self._ewma(self._avg_run, job.finished_at - job.started_at)
+
+    def _ewma(self, current, sample, alpha=0.2):
+        return sample if not current else current + alpha * (sample - current)
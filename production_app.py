@@ -4,7 +4,7 @@ Production-Ready Enhanced Writeup Automation AI Tool
 Exact replica of localhost functionality for live deployment
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 import os
 import json
 import threading
@@ -12,14 +12,26 @@ import time
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import uuid
+import hashlib
 from collections import defaultdict
-import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError, wait, FIRST_COMPLETED
+import asyncio
 
-try:
-    from docx import Document
-except ImportError:
-    print("Error: python-docx not installed")
-    sys.exit(1)
+from session_registry import SessionRegistry
+from session_store import create_session_store, LOG_PREFIX
+from job_scheduler import JobScheduler, QueueFull
+from docx_stream import extract_document_sections_streaming, extract_document_text
+from upload_store import ingest_upload, ParseCache
+from activity_log import ActivityLog, OverflowLog
+from chat_store import ChatHistory
+from export_stream import iter_export_json, iter_export_ndjson, compress_chunks, encode_chunks
+from response_compression import CompressedCache, init_compression, cache_compressed, negotiate_encoding
+from analysis_pipeline import AnalysisPipeline, pipeline_config, run_blocking
+from async_engine import AsyncAnalysisEngine
+from rate_limiter import estimate_tokens
+from cancellation import CancelToken, Cancelled
+from job_journal import create_job_journal, JournalMonitor, process_owner
 
 app = Flask(__name__)
 
@@ -27,31 +39,324 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'production-secure-key-2024')
 app.config['UPLOAD_FOLDER'] = '/tmp/uploads' if os.environ.get('RAILWAY_ENVIRONMENT') else 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024
+app.config['MAX_SESSIONS'] = int(os.environ.get('MAX_SESSIONS', 500))
+app.config['SESSION_IDLE_TTL'] = int(os.environ.get('SESSION_IDLE_TTL', 3600))
+# 'sqlite' shares session state between all workers on a node; 'memory' is per process
+app.config['SESSION_STORE'] = os.environ.get('SESSION_STORE', 'memory')
+app.config['SESSION_STORE_PATH'] = os.environ.get('SESSION_STORE_PATH', os.path.join(tempfile.gettempdir(), 'writeup_sessions.db'))
+app.config['SESSION_STORE_TTL'] = int(os.environ.get('SESSION_STORE_TTL', 24 * 3600))
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get('ANALYSIS_WORKERS', 2))
+app.config['ANALYSIS_QUEUE_SIZE'] = int(os.environ.get('ANALYSIS_QUEUE_SIZE', 32))
+# Sections of one document analyzed at once, all drawing on the process-wide SECTION_POOL_SIZE pool
+app.config['SECTION_CONCURRENCY'] = int(os.environ.get('SECTION_CONCURRENCY', 4))
+# 'threads' runs each analysis on a scheduler worker; 'asyncio' runs them all as coroutines on one event loop
+app.config['ANALYSIS_ENGINE'] = os.environ.get('ANALYSIS_ENGINE', 'threads')
+# asyncio engine: analyses running at once (ASYNC_MAX_IN_FLIGHT caps their provider calls)
+app.config['ASYNC_MAX_JOBS'] = int(os.environ.get('ASYNC_MAX_JOBS', 1000))
+# Cancel a running analysis once its session has gone this long without a request (0 disables).
+# Only applies to the 'memory' session store: with a shared store, polls may land on other workers
+app.config['ANALYSIS_ABANDON_TTL'] = int(os.environ.get('ANALYSIS_ABANDON_TTL', 900))
+# Journal of running analyses and their finished sections; 'sqlite' lets any worker resume a dead worker's job
+app.config['JOB_JOURNAL'] = os.environ.get('JOB_JOURNAL', app.config['SESSION_STORE'])
+app.config['JOB_JOURNAL_PATH'] = os.environ.get('JOB_JOURNAL_PATH', app.config['SESSION_STORE_PATH'])
+app.config['JOB_HEARTBEAT_INTERVAL'] = int(os.environ.get('JOB_HEARTBEAT_INTERVAL', 5))
+# A running job whose worker has not heartbeated for this long is resumed elsewhere
+app.config['JOB_ORPHAN_TIMEOUT'] = int(os.environ.get('JOB_ORPHAN_TIMEOUT', 30))
+# Status streams close after this long; EventSource reconnects on its own
+app.config['STATUS_STREAM_MAX_SECONDS'] = int(os.environ.get('STATUS_STREAM_MAX_SECONDS', 300))
+app.config['STATUS_STREAM_HEARTBEAT'] = 15
+# Longest ?wait= a long-poll may hold; stays under nginx's 60s proxy_read_timeout
+app.config['LONG_POLL_MAX_WAIT'] = int(os.environ.get('LONG_POLL_MAX_WAIT', 25))
+# Status streams and long-polls one worker may hold open at once; kept below the worker's
+# thread count so uploads and API calls always find a free thread
+app.config['MAX_HELD_REQUESTS'] = int(os.environ.get('MAX_HELD_REQUESTS', 48))
+
+app.config['ACTIVITY_LOG_CAPACITY'] = int(os.environ.get('ACTIVITY_LOG_CAPACITY', 500))
+# Entries pushed out of a session's ring buffer are appended here (rotated at 10 MB)
+app.config['ACTIVITY_LOG_OVERFLOW_PATH'] = os.environ.get('ACTIVITY_LOG_OVERFLOW_PATH', os.path.join(tempfile.gettempdir(), 'writeup_activity.log'))
+app.config['CHAT_HISTORY_MAX_TURNS'] = int(os.environ.get('CHAT_HISTORY_MAX_TURNS', 200))
+app.config['CHAT_HISTORY_MAX_AGE'] = int(os.environ.get('CHAT_HISTORY_MAX_AGE', 24 * 3600))
+# JSON responses at least this large are gzip/deflate compressed in-app
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+app.config['COMPRESSION_LEVEL'] = int(os.environ.get('COMPRESSION_LEVEL', 6))
+app.config['COMPRESSION_CACHE_MAX_BYTES'] = int(os.environ.get('COMPRESSION_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+# Upper bound on the decisions one /api/feedback/batch request may apply
+app.config['FEEDBACK_BATCH_MAX'] = int(os.environ.get('FEEDBACK_BATCH_MAX', 5000))
+# Provider, cache, rate limit, batching and heading settings, shared with bulk_analyze.py
+app.config.update(pipeline_config())
+
+# Clients identify their session with this header (per tab) or cookie (per browser)
+SESSION_HEADER = 'X-Session-ID'
+SESSION_COOKIE = 'session_id'
 
 # Global variables (same as localhost)
-current_session = None
-analysis_progress = {"progress": 0, "message": "Ready", "current_section": ""}
-analysis_status = "idle"
-analysis_logs = []
-chat_history = []
-analysis_complete = False
-functionalities_enabled = False
+activity_overflow = OverflowLog(app.config['ACTIVITY_LOG_OVERFLOW_PATH'])
+# Entries not tied to any session
+system_log = ActivityLog(app.config['ACTIVITY_LOG_CAPACITY'], overflow=activity_overflow)
+
+RISK_KEYS = {'High': 'high_risk', 'Medium': 'medium_risk'}
+DECISION_KEYS = {'accepted': 'accepted_feedback', 'rejected': 'rejected_feedback'}
+BATCH_DECISIONS = ('accepted', 'rejected', 'pending')
+
+def empty_statistics():
+    return {
+        'total_feedback': 0,
+        'high_risk': 0,
+        'medium_risk': 0,
+        'low_risk': 0,
+        'by_type': {},
+        'accepted_feedback': 0,
+        'rejected_feedback': 0
+    }
 
 class AnalysisSession:
-    def __init__(self):
-        self.session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    PERSISTED_FIELDS = (
+        'document_name', 'document_path', 'sections', 'section_metadata', 'current_section_index',
+        'guidelines_document', 'guidelines_content',
+        'analysis_id', 'analysis_status', 'analysis_progress', 'analysis_complete', 'functionalities_enabled',
+        'user_feedback'
+    )
+    RESULT_PREFIX = 'result:'
+    DECISION_PREFIX = 'decision:'
+    VERSION_PREFIX = 'version:'
+    
+    def __init__(self, session_id=None, store=None):
+        self.session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         self.document_name = ""
         self.document_path = ""
         self.sections = {}
+        # Per-section word/character/paragraph counts and content hash, computed once at ingest
+        self.section_metadata = {}
+        # Bumped whenever a section's result or decisions change; drives its ETag
+        self.section_versions = {}
         self.analysis_results = {}
+        # Running aggregates, kept in step with analysis_results and decisions
+        self.statistics = empty_statistics()
+        self.section_statistics = {}
+        # feedback id -> (section name, item), and feedback id -> 'accepted' / 'rejected'
+        self.feedback_index = {}
+        self.decisions = {}
         self.user_feedback = defaultdict(list)
-        self.accepted_feedback = defaultdict(list)
-        self.rejected_feedback = defaultdict(list)
+        self.activity_log = ActivityLog(app.config['ACTIVITY_LOG_CAPACITY'], overflow=activity_overflow)
+        self.chat_history = ChatHistory(app.config['CHAT_HISTORY_MAX_TURNS'], app.config['CHAT_HISTORY_MAX_AGE'])
         self.current_section_index = 0
-        self.analysis_thread = None
-        self.stop_analysis_flag = False
+        self.analysis_job = None
+        # Journal key of the current analysis; survives the worker that started it
+        self.analysis_id = None
+        # Cancelled by /api/stop_analysis; replaced for every new analysis
+        self.cancel_token = CancelToken()
         self.guidelines_document = None
         self.guidelines_content = None
+        self.analysis_status = "idle"
+        self.analysis_progress = {"progress": 0, "message": "Ready", "current_section": ""}
+        self.analysis_complete = False
+        self.functionalities_enabled = False
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+        # Monotonic counter bumped on every observable change (uploads, analysis progress, decisions, logs)
+        self.state_version = 0
+        self.store = store
+        self.store_version = 0
+    
+    @classmethod
+    def from_store(cls, session_id, store):
+        session = cls(session_id, store)
+        loaded = store.load(session_id)
+        if loaded is None:
+            return None
+        version, state = loaded
+        session.apply_state(state, version)
+        return session
+    
+    def apply_state(self, state, version):
+        """Replay stored fields written since store_version; a snapshot no newer than that is ignored."""
+        with self.lock:
+            if version <= self.store_version:
+                return
+            decisions = []
+            versions = {}
+            logs = []
+            for field, value in state.items():
+                if field.startswith(LOG_PREFIX):
+                    logs.append(value)
+                elif field.startswith(self.RESULT_PREFIX):
+                    self.record_result(field[len(self.RESULT_PREFIX):], value)
+                elif field.startswith(self.DECISION_PREFIX):
+                    decisions.append((field[len(self.DECISION_PREFIX):], value))
+                elif field.startswith(self.VERSION_PREFIX):
+                    versions[field[len(self.VERSION_PREFIX):]] = value
+                elif field == 'user_feedback':
+                    self.user_feedback = defaultdict(list, value)
+                elif field in self.PERSISTED_FIELDS:
+                    setattr(self, field, value)
+            # Decisions refer to feedback ids, so apply them once every result is indexed
+            for feedback_id, decision in decisions:
+                self.set_decision(feedback_id, decision)
+            # Replaying state bumps local counters; the stored versions are the ones every worker agrees on
+            self.section_versions.update(versions)
+            # Merged rather than replaced: a catch-up load carries only the slots written since
+            for entry in sorted(logs, key=lambda entry: entry['seq']):
+                self.activity_log.add(entry)
+            if self.sections and not self.section_metadata:
+                self.section_metadata = build_section_metadata(self.sections)
+            self.store_version = version
+            self.notify_change()
+    
+    def persist(self, *fields):
+        with self.lock:
+            if self.store is not None:
+                values = {field: getattr(self, field) for field in (fields or self.PERSISTED_FIELDS)}
+                self.saved(self.store.save(self.session_id, values))
+            self.notify_change()
+    
+    def saved(self, version):
+        # Skipping a version means another worker wrote in between; staying behind makes sync_session load it
+        if not self.store.shared or version == self.store_version + 1:
+            self.store_version = version
+    
+    def append_log(self, entry):
+        """Add an activity log entry, numbered by the store so every worker agrees on its seq."""
+        evicted = None
+        with self.lock:
+            if self.store is None:
+                self.activity_log.append(entry)
+            else:
+                version, evicted = self.store.append_log(self.session_id, entry, self.activity_log.capacity)
+                self.activity_log.add(entry)
+                self.saved(version)
+            self.notify_change()
+        if evicted is not None:
+            activity_overflow(evicted)
+    
+    def persist_result(self, section_name):
+        with self.lock:
+            if self.store is not None:
+                values = {
+                    self.RESULT_PREFIX + section_name: self.analysis_results[section_name],
+                    self.VERSION_PREFIX + section_name: self.section_versions.get(section_name, 0)
+                }
+                self.saved(self.store.save(self.session_id, values))
+            self.notify_change()
+    
+    def persist_decisions(self, feedback_ids):
+        with self.lock:
+            if self.store is not None:
+                values = {self.DECISION_PREFIX + feedback_id: self.decisions.get(feedback_id, 'pending')
+                          for feedback_id in feedback_ids}
+                for feedback_id in feedback_ids:
+                    section_name = self.feedback_index[feedback_id][0]
+                    values[self.VERSION_PREFIX + section_name] = self.section_versions.get(section_name, 0)
+                self.saved(self.store.save(self.session_id, values))
+            self.notify_change()
+    
+    def record_result(self, section_name, result):
+        with self.lock:
+            previous = self.analysis_results.get(section_name)
+            new_ids = {item.get('id') for item in result.get('feedback_items', [])}
+            if previous is not None:
+                self._count_result(section_name, previous, -1)
+                for item in previous.get('feedback_items', []):
+                    if item.get('id') not in new_ids:
+                        # Feedback that no longer exists can't stay accepted or rejected
+                        self.set_decision(item.get('id'), 'pending')
+                        self.feedback_index.pop(item.get('id'), None)
+            self.analysis_results[section_name] = result
+            self.section_versions[section_name] = self.section_versions.get(section_name, 0) + 1
+            self._count_result(section_name, result, 1)
+            for item in result.get('feedback_items', []):
+                self.feedback_index[item.get('id')] = (section_name, item)
+    
+    def set_decision(self, feedback_id, decision):
+        """Record 'accepted', 'rejected' or 'pending' for one item in O(1).
+        
+        Returns (section name, item, changed), or None for an unknown id.
+        """
+        with self.lock:
+            entry = self.feedback_index.get(feedback_id)
+            if entry is None:
+                return None
+            section_name, item = entry
+            previous = self.decisions.get(feedback_id, 'pending')
+            if previous == decision:
+                return section_name, item, False
+            
+            section_stats = self.get_section_statistics(section_name, create=True)
+            for stats in (self.statistics, section_stats):
+                if previous in DECISION_KEYS:
+                    stats[DECISION_KEYS[previous]] -= 1
+                if decision in DECISION_KEYS:
+                    stats[DECISION_KEYS[decision]] += 1
+            
+            if decision in DECISION_KEYS:
+                self.decisions[feedback_id] = decision
+            else:
+                self.decisions.pop(feedback_id, None)
+            self.section_versions[section_name] = self.section_versions.get(section_name, 0) + 1
+            return section_name, item, True
+    
+    def apply_decisions(self, decisions):
+        """Apply (feedback id, decision) pairs all-or-nothing.
+        
+        Every id is checked before anything changes, so an unknown id leaves
+        the session untouched. Returns the ids whose decision changed, or
+        None together with the unknown ids.
+        """
+        with self.lock:
+            unknown = [feedback_id for feedback_id, _decision in decisions if feedback_id not in self.feedback_index]
+            if unknown:
+                return None, unknown
+            changed = []
+            for feedback_id, decision in decisions:
+                if self.set_decision(feedback_id, decision)[2]:
+                    changed.append(feedback_id)
+            return changed, []
+    
+    def select_feedback(self, section_name, risk_level=None, feedback_type=None):
+        with self.lock:
+            return [
+                item.get('id') for item in self.analysis_results.get(section_name, {}).get('feedback_items', [])
+                if (risk_level is None or item.get('risk_level', 'Low') == risk_level)
+                and (feedback_type is None or item.get('type', 'unknown') == feedback_type)
+            ]
+    
+    def section_decisions(self, section_name):
+        with self.lock:
+            accepted, rejected = [], []
+            for item in self.analysis_results.get(section_name, {}).get('feedback_items', []):
+                decision = self.decisions.get(item.get('id'))
+                if decision == 'accepted':
+                    accepted.append(item.get('id'))
+                elif decision == 'rejected':
+                    rejected.append(item.get('id'))
+            return {'accepted_feedback': accepted, 'rejected_feedback': rejected}
+    
+    def _count_result(self, section_name, result, sign):
+        section_stats = self.get_section_statistics(section_name, create=True)
+        for item in result.get('feedback_items', []):
+            risk_key = RISK_KEYS.get(item.get('risk_level', 'Low'), 'low_risk')
+            feedback_type = item.get('type', 'unknown')
+            for stats in (self.statistics, section_stats):
+                stats['total_feedback'] += sign
+                stats[risk_key] += sign
+                stats['by_type'][feedback_type] = stats['by_type'].get(feedback_type, 0) + sign
+    
+    def sections_version(self):
+        with self.lock:
+            return sum(self.section_versions.values())
+    
+    def section_etag(self, section_name):
+        metadata = self.section_metadata.get(section_name, {})
+        return f"{self.session_id}-{metadata.get('content_hash', '')[:16]}-{self.section_versions.get(section_name, 0)}"
+    
+    def get_section_statistics(self, section_name, create=False):
+        if create:
+            return self.section_statistics.setdefault(section_name, empty_statistics())
+        return self.section_statistics.get(section_name) or empty_statistics()
+    
+    def notify_change(self):
+        with self.changed:
+            self.state_version += 1
+            self.changed.notify_all()
         
     def get_section_names(self):
         return list(self.sections.keys())
@@ -62,117 +367,176 @@ class AnalysisSession:
             return section_names[self.current_section_index]
         return None
 
-def extract_document_sections_from_docx(doc):
-    sections = {}
-    current_section = "Executive Summary"
-    content = []
-    
-    for para in doc.paragraphs:
-        text = para.text.strip()
-        if text:
-            is_bold = any(run.bold for run in para.runs if run.bold)
-            if is_bold and len(text) < 100 and any(keyword in text.lower() for keyword in ['summary', 'background', 'analysis', 'recommendation', 'conclusion', 'objective', 'scope', 'methodology']):
-                if content:
-                    sections[current_section] = '\n'.join(content)
-                current_section = text.rstrip(':')
-                content = []
-            else:
-                content.append(text)
-    
-    if content:
-        sections[current_section] = '\n'.join(content)
-    
-    return sections
-
-def analyze_section_with_ai(section_name, section_content, guidelines=None):
-    time.sleep(2)  # Simulate AI processing
-    import random
-    
-    feedback_items = []
-    section_lower = section_name.lower()
-    
-    if 'summary' in section_lower:
-        feedback_items.extend([
-            {
-                "id": f"ai_{uuid.uuid4().hex[:8]}",
-                "type": "critical",
-                "category": "completeness",
-                "description": "Executive summary lacks key performance metrics and quantitative data",
-                "suggestion": "Include specific numbers, percentages, and measurable outcomes to strengthen the summary",
-                "risk_level": "High",
-                "confidence": 0.92,
-                "example": "Add metrics like '25% improvement in efficiency' or 'reduced processing time by 3 days'",
-                "questions": ["Does this summary include quantifiable results?", "Are key stakeholders clearly identified?"]
-            },
-            {
-                "id": f"ai_{uuid.uuid4().hex[:8]}",
-                "type": "important",
-                "category": "structure",
-                "description": "Summary structure could be improved for better readability",
-                "suggestion": "Consider reorganizing content with clear subsections: Overview, Key Findings, Recommendations",
-                "risk_level": "Medium",
-                "confidence": 0.85,
-                "example": "Use bullet points for key achievements and numbered lists for recommendations",
-                "questions": ["Is the information presented in logical order?"]
-            }
-        ])
-    
-    elif 'background' in section_lower or 'objective' in section_lower:
-        feedback_items.extend([
-            {
-                "id": f"ai_{uuid.uuid4().hex[:8]}",
-                "type": "critical",
-                "category": "compliance",
-                "description": "Missing regulatory compliance references and industry standards",
-                "suggestion": "Include references to relevant regulations, standards, or company policies",
-                "risk_level": "High",
-                "confidence": 0.88,
-                "example": "Reference ISO standards, regulatory requirements, or internal compliance frameworks",
-                "questions": ["Are all applicable regulations mentioned?", "Is the scope clearly defined?"]
-            }
-        ])
-    
-    elif 'analysis' in section_lower:
-        feedback_items.extend([
-            {
-                "id": f"ai_{uuid.uuid4().hex[:8]}",
-                "type": "critical",
-                "category": "methodology",
-                "description": "Analysis methodology needs more detailed explanation",
-                "suggestion": "Provide step-by-step methodology, data sources, and analytical frameworks used",
-                "risk_level": "High",
-                "confidence": 0.90,
-                "example": "Describe data collection methods, sample sizes, analytical tools, and validation processes",
-                "questions": ["Is the methodology reproducible?", "Are data sources reliable and current?"]
-            },
-            {
-                "id": f"ai_{uuid.uuid4().hex[:8]}",
-                "type": "important",
-                "category": "evidence",
-                "description": "Supporting evidence and documentation could be strengthened",
-                "suggestion": "Add more supporting data, charts, or references to strengthen conclusions",
-                "risk_level": "Medium",
-                "confidence": 0.83,
-                "example": "Include trend analysis, comparative data, or statistical significance tests",
-                "questions": ["Are conclusions supported by sufficient evidence?"]
-            }
-        ])
-    
-    # Add positive feedback
-    if random.random() > 0.3:
-        feedback_items.append({
-            "id": f"ai_{uuid.uuid4().hex[:8]}",
-            "type": "positive",
-            "category": "strength",
-            "description": f"Strong content structure and clear presentation in {section_name}",
-            "suggestion": "Continue maintaining this level of clarity and organization",
-            "risk_level": "Low",
-            "confidence": 0.95,
-            "example": "The logical flow and professional tone enhance readability",
-            "questions": []
-        })
+session_store = create_session_store(app.config['SESSION_STORE'], app.config['SESSION_STORE_PATH'])
+
+def release_session(session):
+    # A process-local store only mirrors resident sessions; shared stores outlive eviction
+    if not session_store.shared:
+        session_store.delete(session.session_id)
+
+sessions = SessionRegistry(
+    max_sessions=app.config['MAX_SESSIONS'],
+    idle_ttl=app.config['SESSION_IDLE_TTL'],
+    is_pinned=lambda session: session.analysis_status in ("queued", "running"),
+    on_evict=release_session
+)
+
+scheduler = JobScheduler(
+    workers=app.config['ANALYSIS_WORKERS'],
+    max_queue=app.config['ANALYSIS_QUEUE_SIZE']
+)
+
+section_executor = ThreadPoolExecutor(
+    max_workers=app.config['SECTION_POOL_SIZE'],
+    thread_name_prefix='section-analysis'
+)
+
+async_engine = AsyncAnalysisEngine(
+    max_jobs=app.config['ASYNC_MAX_JOBS'],
+    max_in_flight=app.config['ASYNC_MAX_IN_FLIGHT']
+)
+
+# Whichever of the two runs analyses; both hand back job_scheduler.Job objects
+analysis_runner = async_engine if app.config['ANALYSIS_ENGINE'] == 'asyncio' else scheduler
+
+# One slot per request that parks a worker thread while it waits for changes
+held_requests = threading.BoundedSemaphore(app.config['MAX_HELD_REQUESTS'])
+
+def get_request_session():
+    session_id = (request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+                  or request.args.get('session_id'))
+    if not session_id:
+        return None
     
-    return {"feedback_items": feedback_items}
+    session = sessions.get(session_id)
+    if session is None and session_store.shared and session_store.version(session_id):
+        # Another worker created this session
+        session = AnalysisSession.from_store(session_id, session_store)
+        if session is not None:
+            sessions.add(session)
+        return session
+    
+    if session is not None:
+        sync_session(session)
+    return session
+
+def sync_session(session):
+    # Another worker may have written to this session since we last looked
+    if not session_store.shared:
+        return
+    if session_store.version(session.session_id) <= session.store_version:
+        return
+    with session.lock:
+        # Loaded under the lock, so a concurrent sync can't apply an older snapshot over this one,
+        # and only the fields written since this worker's copy was current are read
+        loaded = session_store.load(session.session_id, since=session.store_version)
+        if loaded is not None:
+            version, state = loaded
+            session.apply_state(state, version)
+
+def compute_statistics(session):
+    with session.lock:
+        stats = session.statistics
+        return {
+            'total_sections': len(session.sections),
+            'analyzed_sections': len(session.analysis_results),
+            'total_feedback': stats['total_feedback'],
+            'high_risk': stats['high_risk'],
+            'medium_risk': stats['medium_risk'],
+            'low_risk': stats['low_risk'],
+            'by_type': dict(stats['by_type']),
+            'accepted_feedback': stats['accepted_feedback'],
+            'rejected_feedback': stats['rejected_feedback'],
+            'user_feedback': stats['accepted_feedback'] + stats['rejected_feedback']
+        }
+
+def build_section_metadata(sections):
+    metadata = {}
+    for section_name, content in sections.items():
+        metadata[section_name] = {
+            'word_count': len(content.split()),
+            'character_count': len(content),
+            # Extractors join non-blank paragraphs with newlines
+            'paragraph_count': content.count('\n') + 1 if content else 0,
+            'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest()
+        }
+    return metadata
+
+def index_sections(sections):
+    return sections, build_section_metadata(sections)
+
+def section_summary(session, section_name):
+    stats = session.get_section_statistics(section_name)
+    metadata = session.section_metadata.get(section_name, {})
+    return {
+        'name': section_name,
+        'analyzed': section_name in session.analysis_results,
+        'feedback_count': stats['total_feedback'],
+        'high_risk_count': stats['high_risk'],
+        'medium_risk_count': stats['medium_risk'],
+        'low_risk_count': stats['low_risk'],
+        'user_feedback_count': stats['accepted_feedback'] + stats['rejected_feedback'],
+        'word_count': metadata.get('word_count', 0),
+        'paragraph_count': metadata.get('paragraph_count', 0),
+        'content_hash': metadata.get('content_hash'),
+        'version': session.section_versions.get(section_name, 0)
+    }
+
+def wait_for_change(session, current_version):
+    """Honour ?wait=<seconds>&version=<n>: block until current_version(session) differs from n or the wait ends."""
+    version = request.args.get('version', type=int)
+    wait_seconds = min(request.args.get('wait', 0, type=float), app.config['LONG_POLL_MAX_WAIT'])
+    if version is None or wait_seconds <= 0:
+        return
+    if not held_requests.acquire(blocking=False):
+        # Every holding slot is taken; answer now and let the client back off
+        return
+    try:
+        deadline = time.monotonic() + wait_seconds
+        # Short waits let a shared store pick up writes made by other workers
+        poll = 1.0 if session_store.shared else wait_seconds
+        while True:
+            sync_session(session)
+            with session.changed:
+                remaining = deadline - time.monotonic()
+                # Any other version (including one from a different worker) answers at once
+                if current_version(session) != version or remaining <= 0:
+                    return
+                session.changed.wait(timeout=min(poll, remaining))
+    finally:
+        held_requests.release()
+
+def not_modified(etag):
+    # Checked before the payload is built, so a matching revalidation costs almost nothing
+    # Weak comparison, since compressed responses carry a weak ETag
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return None
+
+def with_etag(response, etag, final=False):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    if final:
+        # Once analysis is complete the body for this ETag never changes
+        cache_compressed(response, etag)
+    return response
+
+# Compressed bodies of completed section views, keyed by ETag
+compressed_responses = CompressedCache(app.config['COMPRESSION_CACHE_MAX_BYTES'])
+init_compression(app, compressed_responses, app.config['COMPRESSION_MIN_SIZE'], app.config['COMPRESSION_LEVEL'])
+
+# Parsed uploads keyed by content hash, so identical uploads are parsed once
+parsed_uploads = ParseCache(max_entries=int(os.environ.get('PARSE_CACHE_ENTRIES', 128)))
+
+pipeline = AnalysisPipeline(app.config, engine=async_engine, parse_cache=parsed_uploads)
+heading_detector = pipeline.heading_detector
+analysis_cache = pipeline.cache
+analysis_provider = pipeline.provider
+async_analysis_provider = pipeline.async_provider
+rate_limiter = pipeline.rate_limiter
 
 def process_chat_query(query, context):
     query_lower = query.lower()
@@ -203,15 +567,18 @@ def process_chat_query(query, context):
     else:
         return f"**Hello! I'm TARA, your AI document analysis assistant.**\n\nI've completed analyzing {doc_name} and can help with:\n\n**📊 Analysis Support:**\n• Section-specific feedback\n• Risk assessment explanation\n• Improvement prioritization\n\n**🎯 Specific Guidance:**\n• Compliance requirements\n• Evidence strengthening\n• Structure optimization\n• Content enhancement\n\n**💡 Ask me about:**\n• \"What are the high-risk items?\"\n• \"How can I improve [section name]?\"\n• \"What compliance issues were found?\"\n\nWhat would you like to explore?"
 
-def log_activity(message, level="INFO", section=None):
+def log_activity(message, level="INFO", section=None, session=None):
     log_entry = {
-        "id": f"log_{uuid.uuid4().hex[:8]}",
         "timestamp": datetime.now().isoformat(),
         "level": level,
         "message": message,
-        "section": section
+        "section": section,
+        "session_id": session.session_id if session else None
     }
-    analysis_logs.append(log_entry)
+    if session:
+        session.append_log(log_entry)
+    else:
+        system_log.append(log_entry)
     return log_entry
 
 # Ensure upload directory exists
@@ -227,13 +594,19 @@ def health_check():
         'status': 'healthy',
         'service': 'Enhanced Writeup AI Tool v2.0',
         'environment': 'Production',
-        'upload_folder': app.config['UPLOAD_FOLDER']
+        'upload_folder': app.config['UPLOAD_FOLDER'],
+        'sessions': sessions.stats(),
+        'session_store': app.config['SESSION_STORE'],
+        'scheduler': analysis_runner.stats(),
+        'analysis_cache': analysis_cache.stats(),
+        'rate_limiter': rate_limiter.stats(),
+        'job_journal': journal_monitor.stats(),
+        'analysis_provider': (async_analysis_provider if analysis_runner is async_engine else analysis_provider).stats(),
+        'compressed_responses': compressed_responses.stats()
     }), 200
 
 @app.route('/api/upload', methods=['POST'])
 def upload_document():
-    global current_session, analysis_status
-    
     if 'file' not in request.files:
         return jsonify({'success': False, 'error': 'No file uploaded'}), 400
     
@@ -241,42 +614,50 @@ def upload_document():
     if not file.filename.endswith('.docx'):
         return jsonify({'success': False, 'error': 'Please upload a .docx file'}), 400
     
+    session = AnalysisSession(store=session_store)
+    
     try:
-        current_session = AnalysisSession()
-        analysis_status = "idle"
-        
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        current_session.document_name = filename
-        current_session.document_path = filepath
-        
-        doc = Document(filepath)
-        sections = extract_document_sections_from_docx(doc)
+        upload = ingest_upload(file.stream, app.config['UPLOAD_FOLDER'])
+        try:
+            (sections, metadata), reused = parsed_uploads.get_or_parse(
+                ('document', upload.sha256), lambda: index_sections(extract_document_sections_streaming(upload.buffer, heading_detector))
+            )
+        finally:
+            upload.close()
         
-        current_session.sections = sections
+        session.document_name = filename
+        session.document_path = upload.path
+        session.sections = dict(sections)
+        session.section_metadata = dict(metadata)
+        session.persist()
+        sessions.add(session)
+        session_store.expire(app.config['SESSION_STORE_TTL'])
         
-        log_activity(f"Document uploaded: {filename} ({len(sections)} sections)", "SUCCESS")
+        log_activity(f"Document uploaded: {filename} ({len(sections)} sections){' - reused previous parse' if reused else ''}", "SUCCESS", session=session)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'session_id': current_session.session_id,
+            'session_id': session.session_id,
             'document_name': filename,
             'sections': list(sections.keys()),
             'total_sections': len(sections),
-            'file_size': os.path.getsize(filepath)
+            'file_size': upload.size,
+            'content_hash': upload.sha256,
+            'deduplicated': upload.deduplicated
         })
+        response.set_cookie(SESSION_COOKIE, session.session_id, httponly=True, samesite='Lax')
+        return response
         
     except Exception as e:
-        log_activity(f"Upload failed: {str(e)}", "ERROR")
+        log_activity(f"Upload failed: {str(e)}", "ERROR", session=session)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/upload_guidelines', methods=['POST'])
 def upload_guidelines():
-    global current_session
+    session = get_request_session()
     
-    if not current_session:
+    if not session:
         return jsonify({'success': False, 'error': 'No active session'}), 400
     
     if 'file' not in request.files:
@@ -288,124 +669,417 @@ def upload_guidelines():
     
     try:
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"guidelines_{filename}")
-        file.save(filepath)
+        upload = ingest_upload(file.stream, app.config['UPLOAD_FOLDER'])
+        try:
+            guidelines_content, _ = parsed_uploads.get_or_parse(
+                ('guidelines', upload.sha256), lambda: extract_document_text(upload.buffer)
+            )
+        finally:
+            upload.close()
         
-        doc = Document(filepath)
-        guidelines_content = '\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
+        index = pipeline.guidelines_index_for(guidelines_content)
         
-        current_session.guidelines_document = filepath
-        current_session.guidelines_content = guidelines_content
+        with session.lock:
+            session.guidelines_document = upload.path
+            session.guidelines_content = guidelines_content
+            session.persist('guidelines_document', 'guidelines_content')
         
-        log_activity(f"Guidelines document uploaded: {filename}", "SUCCESS")
+        log_activity(f"Guidelines document uploaded: {filename} ({len(index)} clauses indexed)", "SUCCESS", session=session)
         
         return jsonify({
             'success': True,
             'guidelines_name': filename,
-            'content_length': len(guidelines_content)
+            'content_length': len(guidelines_content),
+            'index': index.stats()
         })
         
     except Exception as e:
-        log_activity(f"Guidelines upload failed: {str(e)}", "ERROR")
+        log_activity(f"Guidelines upload failed: {str(e)}", "ERROR", session=session)
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/start_analysis', methods=['POST'])
-def start_analysis():
-    global current_session, analysis_status, analysis_progress, analysis_complete, functionalities_enabled
+def begin_analysis(session):
+    """Move a queued analysis to running; False if it was stopped before it started."""
+    with session.lock:
+        if session.analysis_status != "queued":
+            return False
+        session.analysis_status = "running"
+        session.analysis_progress = {"progress": 0, "message": "Initializing Hawkeye Analysis Framework...", "current_section": ""}
+        session.persist('analysis_status', 'analysis_progress')
     
-    if not current_session:
-        return jsonify({'success': False, 'error': 'No document uploaded'}), 400
+    log_activity("Starting Hawkeye 20-Point Investigation Framework", "INFO", session=session)
+    return True
+
+def plan_analysis(session):
+    """(section_name, content, guidelines) for every section, in document order."""
+    return pipeline.plan_sections(
+        [(section_name, session.sections[section_name]) for section_name in session.get_section_names()],
+        session.guidelines_content
+    )
+
+def remaining_sections(session):
+    """(sections still to analyze, sections already done, total) - done ones were checkpointed by an earlier attempt."""
+    sections = plan_analysis(session)
+    done = job_journal.completed_sections(session.analysis_id)
+    return [section for section in sections if section[0] not in done], len(done), len(sections)
+
+def log_batch_started(session, batch):
+    for section_name, _content, _guidelines in batch:
+        log_activity(f"Deep analysis: {section_name}", "INFO", section_name, session=session)
+
+def record_section_result(session, section_name, result, completed_sections, total_sections):
+    if session.cancel_token.cancelled or not job_journal.running(session.analysis_id):
+        # Stopped, possibly through a worker whose stop this one hasn't heard of yet; keep the stop's tally
+        session.cancel_token.cancel("Analysis stopped on another worker")
+        return
+    with session.lock:
+        session.record_result(section_name, result)
+        session.persist_result(section_name)
+        session.analysis_progress = {
+            "progress": int((completed_sections / total_sections) * 95),
+            "message": f"Analyzed {section_name} ({completed_sections}/{total_sections})",
+            "current_section": section_name,
+            "completed_sections": completed_sections,
+            "total_sections": total_sections
+        }
+        session.persist('analysis_progress')
+    # Only once the result is in the session store, so a resumed job never skips a lost section
+    job_journal.checkpoint(session.analysis_id, section_name)
     
-    if analysis_status == "running":
-        return jsonify({'success': False, 'error': 'Analysis already in progress'}), 400
+    feedback_count = len(result.get('feedback_items', []))
+    log_activity(f"Analysis complete: {section_name} - {feedback_count} insights generated", "SUCCESS", section_name, session=session)
+
+def stop_analysis_run(session, reason="Analysis stopped by user"):
+    """Mark a queued or running analysis stopped, keeping the sections finished so far; False if it had already ended."""
+    with session.lock:
+        if session.analysis_status not in ("queued", "running"):
+            return False
+        # The journal settles races with the runner and other workers: the first outcome recorded sticks
+        if not finish_job(session, "stopped"):
+            sync_session(session)
+            return False
+        session.analysis_status = "stopped"
+        completed_sections = session.analysis_progress.get("completed_sections", 0)
+        total_sections = session.analysis_progress.get("total_sections", len(session.sections))
+        session.analysis_progress["message"] = f"{reason} - {completed_sections}/{total_sections} sections analyzed"
+        session.persist('analysis_status', 'analysis_progress')
+    log_activity(reason, "WARNING", session=session)
+    return True
+
+def analysis_abandoned(session):
+    ttl = app.config['ANALYSIS_ABANDON_TTL']
+    # Only this worker's requests refresh the registry, so a shared store can't tell
+    return bool(ttl) and not session_store.shared and sessions.idle_seconds(session.session_id) > ttl
+
+def complete_analysis(session):
+    with session.lock:
+        if not finish_job(session, "completed"):
+            # Stopped, perhaps through another worker, while the last sections were finishing
+            sync_session(session)
+            return
+        log_activity("Risk assessment matrix generated - enabling advanced AI features", "INFO", session=session)
+        session.analysis_status = "completed"
+        session.analysis_complete = True
+        session.functionalities_enabled = True
+        session.analysis_progress = {
+            "progress": 100,
+            "message": "Analysis completed! All advanced features now available.",
+            "current_section": ""
+        }
+        session.persist('analysis_status', 'analysis_progress', 'analysis_complete', 'functionalities_enabled')
     
-    analysis_status = "running"
-    analysis_progress = {"progress": 0, "message": "Initializing Hawkeye Analysis Framework...", "current_section": ""}
-    current_session.stop_analysis_flag = False
-    analysis_complete = False
-    functionalities_enabled = False
+    log_activity("Hawkeye analysis completed - All functionalities enabled", "SUCCESS", session=session)
+
+def fail_analysis(session, e):
+    if journal_monitor.exiting:
+        # Pools refuse work while the worker shuts down; the job stays running in the journal for another worker
+        return
+    with session.lock:
+        if not finish_job(session, "error"):
+            sync_session(session)
+            return
+        session.analysis_status = "error"
+        session.analysis_progress["message"] = f"Analysis failed: {str(e)}"
+        session.persist('analysis_status', 'analysis_progress')
+    log_activity(f"Analysis failed: {str(e)}", "ERROR", session=session)
+
+def run_analysis(session, cancel_token):
+    """Analyze a document on a scheduler worker, fanning provider calls out to section_executor."""
+    if not begin_analysis(session):
+        return
     
-    log_activity("Starting Hawkeye 20-Point Investigation Framework", "INFO")
+    # Completed on cancellation, so the wait below wakes even while every section call is still queued
+    cancelled = Future()
+    wake = cancel_token.on_cancel(lambda: cancelled.set_result(None))
     
-    def run_analysis():
-        global analysis_status, analysis_progress, analysis_complete, functionalities_enabled
+    try:
+        sections, completed_sections, total_sections = remaining_sections(session)
+        # The provider decides how sections are packed into calls
+        remaining = iter(analysis_provider.plan_batches(sections))
+        pending = {}
         
-        try:
-            section_names = current_session.get_section_names()
-            total_sections = len(section_names)
+        def submit_next_section():
+            batch = next(remaining, None)
+            if batch is None:
+                return False
+            log_batch_started(session, batch)
+            future = section_executor.submit(pipeline.analyze_sections_cached, batch, cancel_token)
+            pending[future] = batch
+            return True
+        
+        # Keep at most SECTION_CONCURRENCY provider calls of this document in flight
+        while len(pending) < app.config['SECTION_CONCURRENCY'] and submit_next_section():
+            pass
+        
+        while pending:
+            done, _ = wait(list(pending) + [cancelled], return_when=FIRST_COMPLETED)
             
-            for i, section_name in enumerate(section_names):
-                if current_session.stop_analysis_flag:
-                    analysis_status = "stopped"
-                    analysis_progress["message"] = "Analysis stopped by user"
-                    log_activity("Analysis stopped by user", "WARNING")
-                    return
-                
-                progress_percent = int((i / total_sections) * 85)
-                analysis_progress = {
-                    "progress": progress_percent,
-                    "message": f"Analyzing {section_name} ({i+1}/{total_sections})",
-                    "current_section": section_name
-                }
-                
-                log_activity(f"Deep analysis: {section_name}", "INFO", section_name)
-                
-                section_content = current_session.sections[section_name]
-                result = analyze_section_with_ai(section_name, section_content, current_session.guidelines_content)
-                current_session.analysis_results[section_name] = result
-                
-                feedback_count = len(result.get('feedback_items', []))
-                log_activity(f"Analysis complete: {section_name} - {feedback_count} insights generated", "SUCCESS", section_name)
-                
-                time.sleep(1.5)
+            for future in done:
+                if future is cancelled:
+                    continue
+                pending.pop(future)
+                try:
+                    results = future.result()
+                except (Cancelled, CancelledError):
+                    continue
+                for section_name, result in results:
+                    completed_sections += 1
+                    record_section_result(session, section_name, result, completed_sections, total_sections)
             
-            analysis_progress = {
-                "progress": 90,
-                "message": "Generating comprehensive risk assessment...",
-                "current_section": ""
-            }
-            log_activity("Generating risk assessment matrix", "INFO")
-            time.sleep(2)
+            if analysis_abandoned(session):
+                cancel_token.cancel("Analysis abandoned - no client activity")
+            if cancel_token.cancelled:
+                # Queued calls are dropped here; in-flight ones have already been aborted by the token
+                for future in pending:
+                    future.cancel()
+                stop_analysis_run(session, cancel_token.reason)
+                return
             
-            analysis_progress = {
-                "progress": 95,
-                "message": "Finalizing analysis and enabling advanced features...",
-                "current_section": ""
-            }
-            log_activity("Enabling advanced AI features", "INFO")
-            time.sleep(2)
+            while len(pending) < app.config['SECTION_CONCURRENCY'] and submit_next_section():
+                pass
+        
+        complete_analysis(session)
+        
+    except Exception as e:
+        fail_analysis(session, e)
+    finally:
+        cancel_token.remove(wake)
+
+async def run_analysis_async(session, cancel_token):
+    """Analyze a document as a coroutine on async_engine; each provider call is a task, not a thread.
+
+    /api/stop_analysis cancels the job's task, which raises CancelledError in
+    whatever it awaits; the section tasks are cancelled on the way out. A
+    stop that only reaches the cancel token (from another worker through the
+    journal monitor, or an abandoned session) cancels the section tasks on
+    the loop, so in-flight provider calls end at once there too.
+    
+    Everything that writes the session store or the job journal runs through
+    run_blocking: one slow SQLite write on the loop thread would stall every
+    analysis in flight.
+    """
+    if not await run_blocking(begin_analysis, session):
+        return
+    pending = set()
+    
+    async def analyze_batch(batch):
+        await run_blocking(log_batch_started, session, batch)
+        return await pipeline.analyze_sections_cached_async(batch)
+    
+    def cancel_sections():
+        for task in pending:
+            task.cancel()
+    
+    # The token may be cancelled from any thread; the tasks belong to this loop
+    loop = asyncio.get_running_loop()
+    wake = cancel_token.on_cancel(lambda: loop.call_soon_threadsafe(cancel_sections))
+    
+    try:
+        sections, completed_sections, total_sections = await run_blocking(remaining_sections, session)
+        remaining = iter(async_analysis_provider.plan_batches(sections))
+        
+        def submit_next_section():
+            batch = next(remaining, None) if not cancel_token.cancelled else None
+            if batch is None:
+                return False
+            pending.add(asyncio.ensure_future(analyze_batch(batch)))
+            return True
+        
+        # Keep at most SECTION_CONCURRENCY provider calls of this document in flight
+        while len(pending) < app.config['SECTION_CONCURRENCY'] and submit_next_section():
+            pass
+        
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
             
-            analysis_status = "completed"
-            analysis_complete = True
-            functionalities_enabled = True
-            analysis_progress = {
-                "progress": 100,
-                "message": "Analysis completed! All advanced features now available.",
-                "current_section": ""
-            }
+            for task in done:
+                pending.discard(task)
+                if task.cancelled():
+                    continue
+                for section_name, result in task.result():
+                    completed_sections += 1
+                    await run_blocking(record_section_result, session, section_name, result, completed_sections, total_sections)
             
-            log_activity("Hawkeye analysis completed - All functionalities enabled", "SUCCESS")
+            if analysis_abandoned(session):
+                cancel_token.cancel("Analysis abandoned - no client activity")
+            if cancel_token.cancelled:
+                await run_blocking(stop_analysis_run, session, cancel_token.reason)
+                return
             
-        except Exception as e:
-            analysis_status = "error"
-            analysis_progress["message"] = f"Analysis failed: {str(e)}"
-            log_activity(f"Analysis failed: {str(e)}", "ERROR")
+            while len(pending) < app.config['SECTION_CONCURRENCY'] and submit_next_section():
+                pass
+        
+        if cancel_token.cancelled:
+            # Stopped before a single section call was submitted
+            await run_blocking(stop_analysis_run, session, cancel_token.reason)
+            return
+        await run_blocking(complete_analysis, session)
+        
+    except Exception as e:
+        await run_blocking(fail_analysis, session, e)
+    finally:
+        cancel_token.remove(wake)
+        cancel_sections()
+
+def submit_analysis(session):
+    """Hand a queued analysis to the configured runner with a fresh cancel token; raises QueueFull."""
+    session.cancel_token = CancelToken()
+    if analysis_runner is async_engine:
+        session.analysis_job = async_engine.submit(session.session_id, run_analysis_async, session, session.cancel_token)
+    else:
+        session.analysis_job = scheduler.submit(session.session_id, run_analysis, session, session.cancel_token)
+    journal_monitor.track(session.analysis_id, session.cancel_token)
+
+def finish_job(session, status):
+    """Record how the analysis ended; False if it had already ended, possibly on another worker."""
+    journal_monitor.untrack(session.analysis_id)
+    return job_journal.finish(session.analysis_id, status)
+
+def resume_analysis(analysis_id, session_id):
+    """Continue an analysis orphaned by a dead worker, from the sections it had not checkpointed."""
+    session = sessions.get(session_id)
+    if session is None:
+        session = AnalysisSession.from_store(session_id, session_store)
+        if session is None:
+            job_journal.finish(analysis_id, "error")
+            return
+        sessions.add(session)
+    else:
+        sync_session(session)
     
-    current_session.analysis_thread = threading.Thread(target=run_analysis)
-    current_session.analysis_thread.daemon = True
-    current_session.analysis_thread.start()
+    with session.lock:
+        if session.analysis_id != analysis_id or session.analysis_status not in ("queued", "running"):
+            # Restarted or stopped since; this journal entry is stale
+            job_journal.finish(analysis_id, "superseded")
+            return
+        session.analysis_status = "queued"
     
-    return jsonify({'success': True, 'message': 'Analysis started'})
+    log_activity("Resuming analysis interrupted by a worker restart", "WARNING", session=session)
+    try:
+        submit_analysis(session)
+    except QueueFull:
+        # Leave it for the next worker with room
+        job_journal.release(process_owner(), analysis_id)
+
+job_journal = create_job_journal(app.config['JOB_JOURNAL'], app.config['JOB_JOURNAL_PATH'])
+journal_monitor = JournalMonitor(
+    job_journal,
+    resume_analysis,
+    interval=app.config['JOB_HEARTBEAT_INTERVAL'],
+    orphan_timeout=app.config['JOB_ORPHAN_TIMEOUT'],
+    retention=app.config['SESSION_STORE_TTL']
+)
+# gunicorn's worker_exit hook finds it here to hand running analyses off before the worker exits
+app.extensions['journal_monitor'] = journal_monitor
+
+@app.before_request
+def start_journal_monitor():
+    # Every worker heartbeats and adopts orphans, not only those that have started an analysis
+    journal_monitor.ensure_running()
+
+@app.route('/api/start_analysis', methods=['POST'])
+def start_analysis():
+    session = get_request_session()
+    
+    if not session:
+        return jsonify({'success': False, 'error': 'No document uploaded'}), 400
+    
+    with session.lock:
+        if session.analysis_status in ("queued", "running"):
+            return jsonify({'success': False, 'error': 'Analysis already in progress'}), 400
+        
+        previous_state = (session.analysis_status, session.analysis_progress, session.analysis_complete, session.functionalities_enabled)
+        session.analysis_status = "queued"
+        session.analysis_progress = {"progress": 0, "message": "Queued for Hawkeye Analysis Framework...", "current_section": ""}
+        session.analysis_id = f"analysis_{uuid.uuid4().hex[:12]}"
+        session.analysis_complete = False
+        session.functionalities_enabled = False
+    
+    job_journal.start(session.analysis_id, session.session_id, process_owner())
+    try:
+        submit_analysis(session)
+    except QueueFull as e:
+        job_journal.finish(session.analysis_id, "rejected")
+        with session.lock:
+            session.analysis_status, session.analysis_progress, session.analysis_complete, session.functionalities_enabled = previous_state
+        log_activity("Analysis queue full - please retry shortly", "WARNING", session=session)
+        response = jsonify({'success': False, 'error': 'Analysis queue is full, please retry shortly', 'retry_after': e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    
+    session.persist('analysis_id', 'analysis_status', 'analysis_progress', 'analysis_complete', 'functionalities_enabled')
+    
+    return jsonify({
+        'success': True,
+        'message': 'Analysis started',
+        'job_id': session.analysis_job.job_id,
+        'queue_position': analysis_runner.position(session.analysis_job)
+    })
+
+@app.route('/api/stop_analysis', methods=['POST'])
+def stop_analysis():
+    session = get_request_session()
+    
+    if not session:
+        return jsonify({'success': False, 'error': 'No active session'}), 400
+    
+    with session.lock:
+        if session.analysis_status not in ("queued", "running"):
+            return jsonify({'success': False, 'error': 'No analysis in progress'}), 400
+        cancel_token = session.cancel_token
+        job = session.analysis_job
+    
+    # Aborts in-flight provider calls and rate-limit waits; the runner drops its queued section calls
+    cancel_token.cancel("Analysis stopped by user")
+    if job is not None:
+        # Frees a scheduler slot the job never started in, or cancels the asyncio task outright
+        analysis_runner.cancel(job)
+    if not stop_analysis_run(session, cancel_token.reason) and session.analysis_status != "stopped":
+        # It completed or failed (perhaps on another worker) before the stop landed
+        return jsonify({'success': False, 'error': f"Analysis already {session.analysis_status}", 'status': session.analysis_status}), 409
+    
+    with session.lock:
+        progress = dict(session.analysis_progress)
+    
+    return jsonify({
+        'success': True,
+        'message': 'Analysis stopped',
+        'status': session.analysis_status,
+        'progress': progress,
+        'completed_sections': progress.get('completed_sections', 0),
+        'total_sections': progress.get('total_sections', len(session.sections))
+    })
 
 @app.route('/api/status')
 def get_status():
-    global analysis_status, analysis_progress, analysis_logs, analysis_complete, functionalities_enabled
+    session = get_request_session()
     
-    if not current_session:
+    if not session:
         return jsonify({
             'status': 'no_session',
-            'progress': analysis_progress,
-            'logs': analysis_logs[-10:],
+            'progress': {"progress": 0, "message": "Ready", "current_section": ""},
+            'logs': [],
+            'log_cursor': 0,
+            'version': 0,
             'analysis_complete': False,
             'functionalities_enabled': False,
             'statistics': {
@@ -418,101 +1092,174 @@ def get_status():
             }
         })
     
-    total_feedback = 0
-    high_risk = 0
-    medium_risk = 0
-    low_risk = 0
-    
-    for result in current_session.analysis_results.values():
-        feedback_items = result.get('feedback_items', [])
-        total_feedback += len(feedback_items)
-        
-        for item in feedback_items:
-            risk_level = item.get('risk_level', 'Low')
-            if risk_level == 'High':
-                high_risk += 1
-            elif risk_level == 'Medium':
-                medium_risk += 1
-            else:
-                low_risk += 1
-    
-    statistics = {
-        'total_sections': len(current_session.sections),
-        'analyzed_sections': len(current_session.analysis_results),
-        'total_feedback': total_feedback,
-        'high_risk': high_risk,
-        'medium_risk': medium_risk,
-        'low_risk': low_risk,
-        'user_feedback': sum(len(fb) for fb in current_session.user_feedback.values())
-    }
+    # The store's version, unlike state_version, is the same on every worker
+    wait_for_change(session, lambda s: s.store_version)
+    statistics = compute_statistics(session)
+    # ?since=<seq> returns only entries newer than the client's cursor
+    since = request.args.get('since', type=int)
+    session_logs = session.activity_log.since(since) if since is not None else session.activity_log.tail(20)
     
     return jsonify({
-        'status': analysis_status,
-        'progress': analysis_progress,
-        'logs': analysis_logs[-20:],
-        'analysis_complete': analysis_complete,
-        'functionalities_enabled': functionalities_enabled,
+        'status': session.analysis_status,
+        'progress': session.analysis_progress,
+        'logs': session_logs,
+        'log_cursor': session.activity_log.last_seq,
+        'version': session.store_version,
+        'analysis_complete': session.analysis_complete,
+        'functionalities_enabled': session.functionalities_enabled,
         'statistics': statistics,
         'session_info': {
-            'session_id': current_session.session_id,
-            'document_name': current_session.document_name,
-            'current_section': current_session.get_current_section_name()
+            'session_id': session.session_id,
+            'document_name': session.document_name,
+            'current_section': session.get_current_section_name()
+        },
+        'queue': {
+            'position': analysis_runner.position(session.analysis_job) if session.analysis_job else 0,
+            'wait_seconds': round(session.analysis_job.wait_time, 3) if session.analysis_job else 0
         }
     })
 
+@app.route('/api/status/stream')
+def stream_status():
+    session = get_request_session()
+    
+    if not session or not held_requests.acquire(blocking=False):
+        # 204 tells EventSource not to reconnect; the page falls back to polling
+        return Response(status=204)
+    
+    def format_event(event, data):
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    def generate():
+        deadline = time.monotonic() + app.config['STATUS_STREAM_MAX_SECONDS']
+        heartbeat = app.config['STATUS_STREAM_HEARTBEAT']
+        # Short waits let a shared store pick up writes made by other workers
+        wait_timeout = 1.0 if session_store.shared else heartbeat
+        seen_changes = None
+        last_status = None
+        sent_sections = set()
+        log_cursor = 0
+        last_sent = time.monotonic()
+        
+        yield "retry: 2000\n\n"
+        
+        while time.monotonic() < deadline:
+            sync_session(session)
+            
+            with session.changed:
+                if session.state_version == seen_changes:
+                    session.changed.wait(timeout=max(0, min(wait_timeout, deadline - time.monotonic())))
+                seen_changes = session.state_version
+                status = {
+                    'status': session.analysis_status,
+                    'progress': dict(session.analysis_progress),
+                    'analysis_complete': session.analysis_complete,
+                    'functionalities_enabled': session.functionalities_enabled
+                }
+                new_sections = [name for name in session.analysis_results if name not in sent_sections]
+            
+            events = []
+            status['statistics'] = compute_statistics(session)
+            if status != last_status:
+                last_status = status
+                events.append(format_event('progress', status))
+            
+            for section_name in new_sections:
+                sent_sections.add(section_name)
+                events.append(format_event('section', section_summary(session, section_name)))
+            
+            new_logs = session.activity_log.since(log_cursor, limit=None if log_cursor else 20)
+            if new_logs:
+                log_cursor = new_logs[-1]['seq']
+                events.append(format_event('log', new_logs))
+            
+            if events:
+                last_sent = time.monotonic()
+                yield ''.join(events)
+            elif time.monotonic() - last_sent >= heartbeat:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the stream ends or the client goes away, even if nothing was ever sent
+    response.call_on_close(held_requests.release)
+    return response
+
+@app.route('/api/scheduler')
+def get_scheduler_stats():
+    return jsonify(analysis_runner.stats())
+
+@app.route('/api/cache')
+def get_cache_stats():
+    return jsonify(analysis_cache.stats())
+
 @app.route('/api/sections')
 def get_sections():
-    if not current_session:
+    session = get_request_session()
+    
+    if not session:
         return jsonify({'sections': []})
     
-    sections_info = []
-    for section_name, content in current_session.sections.items():
-        analysis_result = current_session.analysis_results.get(section_name, {})
-        feedback_items = analysis_result.get('feedback_items', [])
-        
-        risk_counts = {'High': 0, 'Medium': 0, 'Low': 0}
-        for item in feedback_items:
-            risk_level = item.get('risk_level', 'Low')
-            risk_counts[risk_level] = risk_counts.get(risk_level, 0) + 1
-        
-        sections_info.append({
-            'name': section_name,
-            'word_count': len(content.split()),
-            'analyzed': section_name in current_session.analysis_results,
-            'feedback_count': len(feedback_items),
-            'high_risk_count': risk_counts['High'],
-            'medium_risk_count': risk_counts['Medium'],
-            'low_risk_count': risk_counts['Low'],
-            'user_feedback_count': len(current_session.user_feedback.get(section_name, []))
-        })
+    # Sections only change with results and decisions, so they wait on their own version
+    wait_for_change(session, AnalysisSession.sections_version)
+    with session.lock:
+        etag = hashlib.sha256('\n'.join(
+            f"{name}\0{session.section_etag(name)}" for name in session.sections
+        ).encode('utf-8')).hexdigest()[:32]
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        sections_info = [section_summary(session, section_name) for section_name in session.sections]
+        version = session.sections_version()
+        complete = session.analysis_complete
     
-    return jsonify({'sections': sections_info})
+    return with_etag(jsonify({'sections': sections_info, 'version': version}), etag, final=complete)
 
 @app.route('/api/section/<section_name>')
 def get_section_analysis(section_name):
-    if not current_session or section_name not in current_session.sections:
+    session = get_request_session()
+    
+    if not session or section_name not in session.sections:
         return jsonify({'success': False, 'error': 'Section not found'}), 404
     
-    content = current_session.sections.get(section_name, "")
-    analysis = current_session.analysis_results.get(section_name, {})
-    user_feedback = current_session.user_feedback.get(section_name, [])
-    accepted_feedback = current_session.accepted_feedback.get(section_name, [])
-    rejected_feedback = current_session.rejected_feedback.get(section_name, [])
+    with session.lock:
+        etag = session.section_etag(section_name)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        content = session.sections.get(section_name, "")
+        metadata = session.section_metadata.get(section_name, {})
+        version = session.section_versions.get(section_name, 0)
+        complete = session.analysis_complete
+        analysis = session.analysis_results.get(section_name, {})
+        user_feedback = list(session.user_feedback.get(section_name, []))
+        decided = session.section_decisions(section_name)
+        decisions = {feedback_id: session.decisions[feedback_id]
+                     for ids in decided.values() for feedback_id in ids}
     
-    return jsonify({
+    return with_etag(jsonify({
         'success': True,
         'section_name': section_name,
         'content': content,
         'analysis': analysis,
         'user_feedback': user_feedback,
-        'accepted_feedback': accepted_feedback,
-        'rejected_feedback': rejected_feedback,
-        'word_count': len(content.split()),
-        'character_count': len(content)
-    })
+        'accepted_feedback': decided['accepted_feedback'],
+        'rejected_feedback': decided['rejected_feedback'],
+        'decisions': decisions,
+        'word_count': metadata.get('word_count', 0),
+        'character_count': metadata.get('character_count', 0),
+        'paragraph_count': metadata.get('paragraph_count', 0),
+        'content_hash': metadata.get('content_hash'),
+        'version': version
+    }), etag, final=complete)
 
 @app.route('/api/chat/basic', methods=['POST'])
 def basic_chat():
+    session = get_request_session()
+    
     try:
         data = request.json
         message = data.get('message', '').strip()
@@ -524,46 +1271,37 @@ def basic_chat():
             }), 400
         
         context = {
-            'current_section': current_session.get_current_section_name() if current_session else None,
-            'document_name': current_session.document_name if current_session else None,
-            'session_active': current_session is not None,
-            'analysis_status': analysis_status,
-            'total_sections': len(current_session.sections) if current_session else 0,
-            'analyzed_sections': len(current_session.analysis_results) if current_session else 0,
-            'has_guidelines': current_session.guidelines_content is not None if current_session else False,
-            'functionalities_enabled': functionalities_enabled
+            'current_section': session.get_current_section_name() if session else None,
+            'document_name': session.document_name if session else None,
+            'session_active': session is not None,
+            'analysis_status': session.analysis_status if session else "idle",
+            'total_sections': len(session.sections) if session else 0,
+            'analyzed_sections': len(session.analysis_results) if session else 0,
+            'has_guidelines': session.guidelines_content is not None if session else False,
+            'functionalities_enabled': session.functionalities_enabled if session else False
         }
         
-        if current_session and functionalities_enabled:
-            high_risk = medium_risk = low_risk = 0
-            
-            for result in current_session.analysis_results.values():
-                for item in result.get('feedback_items', []):
-                    risk = item.get('risk_level', 'Low')
-                    if risk == 'High': high_risk += 1
-                    elif risk == 'Medium': medium_risk += 1
-                    else: low_risk += 1
+        if session and session.functionalities_enabled:
+            statistics = compute_statistics(session)
+            section_stats = session.get_section_statistics(context['current_section'])
             
             context.update({
-                'high_risk': high_risk,
-                'medium_risk': medium_risk,
-                'low_risk': low_risk,
-                'word_count': len(current_session.sections.get(context['current_section'], '').split()) if context['current_section'] else 0
+                'high_risk': statistics['high_risk'],
+                'medium_risk': statistics['medium_risk'],
+                'low_risk': statistics['low_risk'],
+                'section_high_risk': section_stats['high_risk'],
+                'section_medium_risk': section_stats['medium_risk'],
+                'word_count': session.section_metadata.get(context['current_section'], {}).get('word_count', 0)
             })
         
+        # Chat is served ahead of any analysis calls waiting on the provider budget
+        rate_limiter.acquire('chat', estimate_tokens(message))
         response = process_chat_query(message, context)
         
-        chat_entry = {
-            'id': f"chat_{uuid.uuid4().hex[:8]}",
-            'timestamp': datetime.now().isoformat(),
-            'user_message': message,
-            'ai_response': response,
-            'context': context,
-            'llm_used': 'Enhanced Tara AI'
-        }
-        chat_history.append(chat_entry)
+        if session:
+            session.chat_history.append(message, response, context, 'Enhanced Tara AI')
         
-        log_activity(f"Chat interaction: {message[:30]}...", "INFO")
+        log_activity(f"Chat interaction: {message[:30]}...", "INFO", session=session)
         
         return jsonify({
             'success': True,
@@ -574,125 +1312,186 @@ def basic_chat():
         })
         
     except Exception as e:
-        log_activity(f"Chat processing failed: {str(e)}", "ERROR")
+        log_activity(f"Chat processing failed: {str(e)}", "ERROR", session=session)
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/feedback/accept', methods=['POST'])
-def accept_feedback():
-    global functionalities_enabled
+@app.route('/api/chat/history')
+def get_chat_history():
+    session = get_request_session()
     
-    if not current_session:
+    if not session:
         return jsonify({'success': False, 'error': 'No active session'}), 400
     
-    if not functionalities_enabled:
-        return jsonify({'success': False, 'error': 'Please wait for analysis to complete'}), 400
+    before = request.args.get('before', type=int)
+    limit = min(request.args.get('limit', 20, type=int), 100)
     
-    try:
-        data = request.json
-        section = data.get('section')
-        feedback_id = data.get('feedback_id')
-        
-        analysis_result = current_session.analysis_results.get(section, {})
-        feedback_items = analysis_result.get('feedback_items', [])
-        
-        feedback_item = None
-        for item in feedback_items:
-            if item.get('id') == feedback_id:
-                feedback_item = item
-                break
-        
-        if not feedback_item:
-            return jsonify({'success': False, 'error': 'Feedback item not found'}), 400
-        
-        current_session.accepted_feedback[section].append(feedback_item)
-        current_session.rejected_feedback[section] = [
-            item for item in current_session.rejected_feedback[section] 
-            if item.get('id') != feedback_id
-        ]
-        
-        log_activity(f"Feedback accepted: {feedback_item.get('type', 'unknown')} in {section}", "SUCCESS", section)
-        
-        return jsonify({'success': True, 'message': 'Feedback accepted'})
-        
-    except Exception as e:
-        log_activity(f"Failed to accept feedback: {str(e)}", "ERROR")
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify(dict(session.chat_history.page(before=before, limit=limit), success=True))
 
-@app.route('/api/feedback/reject', methods=['POST'])
-def reject_feedback():
-    global functionalities_enabled
+def record_decision(decision):
+    session = get_request_session()
     
-    if not current_session:
+    if not session:
         return jsonify({'success': False, 'error': 'No active session'}), 400
     
-    if not functionalities_enabled:
+    if not session.functionalities_enabled:
         return jsonify({'success': False, 'error': 'Please wait for analysis to complete'}), 400
     
+    verb = 'accept' if decision == 'accepted' else 'reject'
     try:
         data = request.json
         section = data.get('section')
         feedback_id = data.get('feedback_id')
         
-        analysis_result = current_session.analysis_results.get(section, {})
-        feedback_items = analysis_result.get('feedback_items', [])
-        
-        feedback_item = None
-        for item in feedback_items:
-            if item.get('id') == feedback_id:
-                feedback_item = item
-                break
-        
-        if not feedback_item:
-            return jsonify({'success': False, 'error': 'Feedback item not found'}), 400
-        
-        current_session.rejected_feedback[section].append(feedback_item)
-        current_session.accepted_feedback[section] = [
-            item for item in current_session.accepted_feedback[section] 
-            if item.get('id') != feedback_id
-        ]
+        with session.lock:
+            indexed = session.feedback_index.get(feedback_id)
+            if indexed is None or (section and indexed[0] != section):
+                return jsonify({'success': False, 'error': 'Feedback item not found'}), 400
+            
+            section, feedback_item, changed = session.set_decision(feedback_id, decision)
+            if changed:
+                session.persist_decisions([feedback_id])
         
-        log_activity(f"Feedback rejected: {feedback_item.get('type', 'unknown')} in {section}", "WARNING", section)
+        if changed:
+            log_activity(f"Feedback {decision}: {feedback_item.get('type', 'unknown')} in {section}",
+                         "SUCCESS" if decision == 'accepted' else "WARNING", section, session=session)
         
-        return jsonify({'success': True, 'message': 'Feedback rejected'})
+        return jsonify({
+            'success': True,
+            'message': f"Feedback {decision}",
+            'feedback_id': feedback_id,
+            'decision': decision,
+            'changed': changed
+        })
         
     except Exception as e:
-        log_activity(f"Failed to reject feedback: {str(e)}", "ERROR")
+        log_activity(f"Failed to {verb} feedback: {str(e)}", "ERROR", session=session)
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/export', methods=['POST'])
-def export_results():
-    if not current_session:
+@app.route('/api/feedback/batch', methods=['POST'])
+def batch_feedback():
+    """Apply many decisions in one request.
+    
+    Body: {"operations": [{"feedback_id": ..., "decision": "accepted" | "rejected" | "pending"}],
+           "select": {"section": ..., "risk_level": "Low", "type": ..., "decision": ...}}
+    Either key may be omitted; "select" may also be a list of selectors.
+    Explicit operations run after selectors, so they win on overlap.
+    """
+    session = get_request_session()
+    
+    if not session:
         return jsonify({'success': False, 'error': 'No active session'}), 400
     
+    if not session.functionalities_enabled:
+        return jsonify({'success': False, 'error': 'Please wait for analysis to complete'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    selectors = data.get('select') or []
+    if isinstance(selectors, dict):
+        selectors = [selectors]
+    operations = data.get('operations') or []
+    
     try:
-        export_data = {
-            'session_metadata': {
-                'session_id': current_session.session_id,
-                'document_name': current_session.document_name,
-                'generated_at': datetime.now().isoformat(),
-                'analysis_framework': 'Hawkeye 20-Point Investigation Framework'
-            },
-            'document_sections': current_session.sections,
-            'analysis_results': current_session.analysis_results,
-            'user_feedback': dict(current_session.user_feedback),
-            'accepted_feedback': dict(current_session.accepted_feedback),
-            'rejected_feedback': dict(current_session.rejected_feedback),
-            'chat_history': chat_history,
-            'analysis_logs': analysis_logs
-        }
+        with session.lock:
+            decisions = []
+            for selector in selectors:
+                if selector.get('decision') not in BATCH_DECISIONS:
+                    return jsonify({'success': False, 'error': f"Invalid decision: {selector.get('decision')}"}), 400
+                if selector.get('section') not in session.sections:
+                    return jsonify({'success': False, 'error': f"Section not found: {selector.get('section')}"}), 400
+                for feedback_id in session.select_feedback(selector['section'], selector.get('risk_level'), selector.get('type')):
+                    decisions.append((feedback_id, selector['decision']))
+            for operation in operations:
+                if operation.get('decision') not in BATCH_DECISIONS:
+                    return jsonify({'success': False, 'error': f"Invalid decision: {operation.get('decision')}"}), 400
+                decisions.append((operation.get('feedback_id'), operation['decision']))
+            
+            if len(decisions) > app.config['FEEDBACK_BATCH_MAX']:
+                return jsonify({'success': False, 'error': f"Batch exceeds {app.config['FEEDBACK_BATCH_MAX']} decisions"}), 400
+            
+            changed, unknown = session.apply_decisions(decisions)
+            if changed is None:
+                return jsonify({'success': False, 'error': 'Feedback item not found', 'unknown_ids': unknown[:50]}), 400
+            
+            touched = sorted({session.feedback_index[feedback_id][0] for feedback_id, _decision in decisions},
+                             key=list(session.sections).index)
+            section_counts = {}
+            for section_name in touched:
+                stats = session.get_section_statistics(section_name)
+                section_counts[section_name] = {
+                    'total_feedback': stats['total_feedback'],
+                    'accepted_feedback': stats['accepted_feedback'],
+                    'rejected_feedback': stats['rejected_feedback'],
+                    'pending_feedback': stats['total_feedback'] - stats['accepted_feedback'] - stats['rejected_feedback']
+                }
+            totals = {key: session.statistics[key] for key in ('total_feedback', 'accepted_feedback', 'rejected_feedback')}
+            if changed:
+                session.persist_decisions(changed)
         
-        log_activity("Analysis results exported", "SUCCESS")
+        # One log entry for the whole batch rather than one per item
+        if changed:
+            log_activity(f"Batch feedback: {len(changed)} of {len(decisions)} decisions changed across {len(touched)} section(s)",
+                         "SUCCESS", session=session)
         
         return jsonify({
             'success': True,
-            'export_data': export_data,
-            'filename': f"hawkeye_analysis_{current_session.session_id}.json"
+            'applied': len(decisions),
+            'changed': len(changed),
+            'sections': section_counts,
+            'statistics': totals
         })
         
     except Exception as e:
-        log_activity(f"Export failed: {str(e)}", "ERROR")
+        log_activity(f"Failed to apply feedback batch: {str(e)}", "ERROR", session=session)
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/feedback/accept', methods=['POST'])
+def accept_feedback():
+    return record_decision('accepted')
+
+@app.route('/api/feedback/reject', methods=['POST'])
+def reject_feedback():
+    return record_decision('rejected')
+
+@app.route('/api/export', methods=['GET', 'POST'])
+def export_results():
+    session = get_request_session()
+    
+    if not session:
+        return jsonify({'success': False, 'error': 'No active session'}), 400
+    
+    export_format = request.args.get('format', 'json')
+    if export_format not in ('json', 'ndjson'):
+        return jsonify({'success': False, 'error': 'Export format must be json or ndjson'}), 400
+    
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding')) if request.args.get('compress', '1') != '0' else None
+    metadata = {
+        'session_id': session.session_id,
+        'document_name': session.document_name,
+        'generated_at': datetime.now().isoformat(),
+        'analysis_framework': 'Hawkeye 20-Point Investigation Framework'
+    }
+    filename = f"hawkeye_analysis_{session.session_id}.{export_format}"
+    
+    def generate():
+        chunks = iter_export_json(session, metadata) if export_format == 'json' else iter_export_ndjson(session, metadata)
+        try:
+            yield from (compress_chunks(chunks, encoding) if encoding else encode_chunks(chunks))
+            log_activity(f"Analysis results exported ({export_format})", "SUCCESS", session=session)
+        except Exception as e:
+            # Headers are already sent, so the client sees a truncated download
+            log_activity(f"Export failed: {str(e)}", "ERROR", session=session)
+            raise
+    
+    headers = {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Vary': 'Accept-Encoding'
+    }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    
+    mimetype = 'application/json' if export_format == 'json' else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype, headers=headers)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5005))
     
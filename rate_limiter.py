@@ -0,0 +1,286 @@
+"""
+Rate Limiter for Enhanced Writeup Automation AI Tool
+Token buckets for provider requests/s and tokens/s, with chat served ahead of bulk analysis
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Lanes in priority order: a lane only draws from the buckets while no earlier lane is waiting
+LANES = ('chat', 'analysis')
+
+# Rough size of a provider token in characters, for budgeting before the call is made
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*texts):
+    return sum(len(text or '') for text in texts) // CHARS_PER_TOKEN + 1
+
+
+def _refill(level, updated, rate, capacity, now):
+    return min(capacity, level + max(0.0, now - updated) * rate)
+
+
+def _shortfall(levels, limits, amounts, reserve):
+    """Seconds until every bucket can pay its amount and still hold back ``reserve`` of its capacity.
+
+    A call larger than that only has to wait for a full bucket, or it could
+    never go out; paying it then leaves the bucket in debt.
+    """
+    delay = 0.0
+    for name, amount in amounts.items():
+        rate, capacity = limits[name]
+        need = min(amount + reserve * capacity, capacity)
+        if levels[name] < need:
+            delay = max(delay, (need - levels[name]) / rate)
+    return delay
+
+
+class MemoryBuckets:
+    """Bucket levels for this process only."""
+
+    shared = False
+
+    def __init__(self):
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    def take(self, limits, amounts, reserve, now):
+        with self._lock:
+            levels = {}
+            for name in amounts:
+                rate, capacity = limits[name]
+                level, updated = self._levels.get(name, (capacity, now))
+                levels[name] = _refill(level, updated, rate, capacity, now)
+            delay = _shortfall(levels, limits, amounts, reserve)
+            if delay == 0:
+                for name, amount in amounts.items():
+                    self._levels[name] = (levels[name] - amount, now)
+            return delay
+
+
+class SQLiteBuckets:
+    """Bucket levels in a SQLite file, so every worker on the node draws from one budget.
+
+    Each take is a single ``BEGIN IMMEDIATE`` transaction that refills,
+    checks and debits all buckets together.
+    """
+
+    shared = True
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)'
+        )
+
+    def _connect(self):
+        # Connections must not cross a fork (preload_app) or be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def take(self, limits, amounts, reserve, now):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            stored = dict(
+                (name, (level, updated)) for name, level, updated in
+                conn.execute('SELECT name, level, updated FROM rate_buckets')
+            )
+            levels = {}
+            for name in amounts:
+                rate, capacity = limits[name]
+                level, updated = stored.get(name, (capacity, now))
+                levels[name] = _refill(level, updated, rate, capacity, now)
+            delay = _shortfall(levels, limits, amounts, reserve)
+            if delay == 0:
+                conn.executemany(
+                    'INSERT INTO rate_buckets (name, level, updated) VALUES (?, ?, ?) '
+                    'ON CONFLICT (name) DO UPDATE SET level = excluded.level, updated = excluded.updated',
+                    [(name, levels[name] - amount, now) for name, amount in amounts.items()]
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return delay
+
+
+class LaneMetrics:
+    def __init__(self, window=1024):
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.waiting = 0
+        self._recent = deque(maxlen=window)
+
+    def record(self, waited):
+        self.acquired += 1
+        if waited > 0.001:
+            self.delayed += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._recent.append(waited)
+
+    def stats(self):
+        recent = sorted(self._recent)
+
+        def percentile(p):
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 4) if recent else 0.0
+
+        return {
+            'acquired': self.acquired,
+            'delayed': self.delayed,
+            'waiting': self.waiting,
+            'avg_wait_seconds': round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            'p50_wait_seconds': percentile(0.50),
+            'p95_wait_seconds': percentile(0.95),
+            'max_wait_seconds': round(self.max_wait, 4)
+        }
+
+
+class RateLimiter:
+    """Shared requests/s and tokens/s budget for provider calls.
+
+    Every provider call takes one request and its estimated tokens from the
+    buckets, each sized for ``burst_seconds`` of traffic. A zero rate leaves
+    that dimension unlimited; with both zero the limiter is a no-op.
+
+    Calls are always charged in full. One estimated above a bucket's
+    capacity goes out once the bucket is full and drives its level negative;
+    every later call, chat included, then waits while the debt refills, so
+    oversized sections cost the budget what they use rather than at most
+    one burst.
+
+    Priority works at two levels. Within a process, analysis calls wait while
+    any chat call is waiting, so queued section calls never hold up a chat
+    reply. Across workers sharing SQLite buckets, analysis may not draw a
+    bucket below ``analysis_reserve`` of its capacity, which leaves headroom
+    for chat arriving at any worker.
+    """
+
+    def __init__(self, requests_per_second=0, tokens_per_second=0, burst_seconds=1.0,
+                 analysis_reserve=0.2, buckets=None, poll_interval=0.05):
+        self.limits = {}
+        if requests_per_second > 0:
+            self.limits['requests'] = (requests_per_second, max(1.0, requests_per_second * burst_seconds))
+        if tokens_per_second > 0:
+            self.limits['tokens'] = (tokens_per_second, max(1.0, tokens_per_second * burst_seconds))
+        self.enabled = bool(self.limits)
+        self.reserve = {'chat': 0.0, 'analysis': analysis_reserve}
+        self.buckets = buckets or MemoryBuckets()
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._metrics = {lane: LaneMetrics() for lane in LANES}
+
+    def _amounts(self, tokens):
+        amounts = {'requests': 1, 'tokens': tokens}
+        return {name: amount for name, amount in amounts.items() if name in self.limits}
+
+    def _try_take(self, lane, amounts):
+        """0 once the call may proceed, else seconds to wait before trying again.
+
+        Only the lane check holds the condition: a take on shared buckets is a
+        SQLite transaction that can wait on another worker's write lock, and
+        nothing else in this process should queue behind that.
+        """
+        with self._cond:
+            if any(self._metrics[ahead].waiting for ahead in LANES[:LANES.index(lane)]):
+                return self.poll_interval
+        return self.buckets.take(self.limits, amounts, self.reserve[lane], time.time())
+
+    def acquire(self, lane, tokens=0, cancel_token=None):
+        """Block until a ``lane`` call of ``tokens`` estimated tokens may go out; returns seconds waited.
+
+        Raises ``Cancelled`` within one poll interval of ``cancel_token`` being cancelled.
+        """
+        if not self.enabled:
+            return 0.0
+        amounts = self._amounts(tokens)
+        start = time.monotonic()
+        metrics = self._metrics[lane]
+        with self._cond:
+            metrics.waiting += 1
+        try:
+            while True:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                delay = self._try_take(lane, amounts)
+                if delay == 0:
+                    break
+                with self._cond:
+                    self._cond.wait(min(delay, self.poll_interval))
+        finally:
+            with self._cond:
+                metrics.waiting -= 1
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        with self._cond:
+            metrics.record(waited)
+        return waited
+
+    async def _try_take_async(self, lane, amounts):
+        # A take on shared buckets is a SQLite transaction, so it goes to a thread rather than the loop
+        if not self.buckets.shared:
+            return self._try_take(lane, amounts)
+        return await asyncio.get_running_loop().run_in_executor(None, self._try_take, lane, amounts)
+
+    async def acquire_async(self, lane, tokens=0):
+        """acquire() for coroutines on the asyncio engine: waits by sleeping, not by blocking the loop."""
+        if not self.enabled:
+            return 0.0
+        amounts = self._amounts(tokens)
+        start = time.monotonic()
+        metrics = self._metrics[lane]
+        # The condition now only guards lane bookkeeping, so taking it here never waits on SQLite
+        with self._cond:
+            metrics.waiting += 1
+        try:
+            while True:
+                delay = await self._try_take_async(lane, amounts)
+                if delay == 0:
+                    break
+                await asyncio.sleep(min(delay, self.poll_interval))
+        finally:
+            with self._cond:
+                metrics.waiting -= 1
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        with self._cond:
+            metrics.record(waited)
+        return waited
+
+    def stats(self):
+        with self._cond:
+            return {
+                'enabled': self.enabled,
+                'shared': self.buckets.shared,
+                'limits': {name: {'rate': rate, 'burst': capacity} for name, (rate, capacity) in self.limits.items()},
+                'analysis_reserve': self.reserve['analysis'],
+                'lanes': {lane: metrics.stats() for lane, metrics in self._metrics.items()}
+            }
+
+
+def create_rate_limiter(backend='memory', path=None, **options):
+    if backend == 'memory':
+        return RateLimiter(buckets=MemoryBuckets(), **options)
+    if backend == 'sqlite':
+        return RateLimiter(buckets=SQLiteBuckets(path), **options)
+    raise ValueError(f"Unknown rate limit store: {backend}")
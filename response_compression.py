@@ -0,0 +1,137 @@
+"""
+Response Compression for Enhanced Writeup Automation AI Tool
+Negotiated gzip/deflate for API responses, with a cache of pre-compressed bodies
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+# wbits selecting the container: 31 is a gzip stream, 15 a zlib stream (HTTP "deflate")
+ENCODING_WBITS = {'gzip': 31, 'deflate': 15}
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'text/html', 'text/plain',
+    'text/css', 'text/javascript', 'application/javascript'
+}
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick gzip or deflate from an Accept-Encoding header, honouring q-values."""
+    qualities = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    # Encodings listed in the header win over "*"; gzip is tried first so it wins ties
+    for encoding in ('gzip', 'deflate'):
+        q = qualities.get(encoding, qualities.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_bytes(data, encoding, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODING_WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (cache key, encoding), bounded by total size."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def cache_compressed(response, key):
+    """Mark a response whose body never changes for ``key``, so its compressed form is reused."""
+    response.compression_key = key
+    return response
+
+
+def init_compression(app, cache=None, min_size=1024, level=6):
+    """Compress eligible responses after each request.
+
+    Streamed responses (exports, SSE) and bodies that already carry a
+    Content-Encoding are left alone.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        if response.calculate_content_length() < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        key = getattr(response, 'compression_key', None)
+        data = cache.get((key, encoding)) if cache is not None and key else None
+        if data is None:
+            data = compress_bytes(response.get_data(), encoding, level)
+            if cache is not None and key:
+                cache.put((key, encoding), data)
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        # The encoded body differs byte-for-byte, so its validator can only be weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
@@ -0,0 +1,113 @@
+"""
+Session Registry for Enhanced Writeup Automation AI Tool
+Keeps many analysis sessions resident per process, keyed by session_id
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionRegistry:
+    """LRU registry of analysis sessions with idle-TTL eviction.
+
+    Sessions are ordered from least to most recently used. Adding a session
+    beyond ``max_sessions`` evicts the least recently used one, and any
+    session untouched for ``idle_ttl`` seconds is dropped on the next access.
+    Sessions for which ``is_pinned(session)`` returns True (e.g. a running
+    analysis) are never evicted.
+    """
+
+    def __init__(self, max_sessions=500, idle_ttl=3600, is_pinned=None, on_evict=None):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.is_pinned = is_pinned or (lambda session: False)
+        self.on_evict = on_evict
+        self._sessions = OrderedDict()
+        self._last_access = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+    def add(self, session):
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            self._last_access[session.session_id] = time.monotonic()
+            evicted = self._evict_locked()
+        self._notify_evicted(evicted)
+        return session
+
+    def get(self, session_id):
+        if not session_id:
+            return None
+        with self._lock:
+            evicted = self._expire_locked()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self._last_access[session_id] = time.monotonic()
+        self._notify_evicted(evicted)
+        return session
+
+    def remove(self, session_id):
+        with self._lock:
+            self._last_access.pop(session_id, None)
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._notify_evicted([session])
+        return session
+
+    def idle_seconds(self, session_id):
+        """Seconds since the session was last added or fetched; 0 if it is not resident."""
+        with self._lock:
+            last_access = self._last_access.get(session_id)
+        return time.monotonic() - last_access if last_access is not None else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'resident_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl': self.idle_ttl
+            }
+
+    def _expire_locked(self):
+        if not self.idle_ttl:
+            return []
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = []
+        for session_id, session in list(self._sessions.items()):
+            if self._last_access[session_id] >= cutoff:
+                # Entries are in LRU order, so everything after this is fresher
+                break
+            if not self.is_pinned(session):
+                expired.append(self._pop_locked(session_id))
+        return expired
+
+    def _evict_locked(self):
+        evicted = self._expire_locked()
+        if len(self._sessions) <= self.max_sessions:
+            return evicted
+        # Never the session just added: with the rest pinned, it would vanish before its caller could use it
+        for session_id, session in list(self._sessions.items())[:-1]:
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if not self.is_pinned(session):
+                evicted.append(self._pop_locked(session_id))
+        return evicted
+
+    def _pop_locked(self, session_id):
+        self._last_access.pop(session_id, None)
+        return self._sessions.pop(session_id)
+
+    def _notify_evicted(self, sessions):
+        if self.on_evict:
+            for session in sessions:
+                self.on_evict(session)
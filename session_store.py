@@ -0,0 +1,252 @@
+"""
+Session Store for Enhanced Writeup Automation AI Tool
+Pluggable persistence for session state, shared across gunicorn workers
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Activity log entries live in ring slots log:<seq % capacity>; log_seq holds the last number handed out
+LOG_PREFIX = 'log:'
+LOG_SEQ_FIELD = 'log_seq'
+
+
+class MemorySessionStore:
+    """Process-local store. Values are kept by reference, not serialized."""
+
+    shared = False
+
+    def __init__(self):
+        self._sessions = {}
+        self._versions = {}
+        # session id -> field -> session version it was last written at
+        self._field_versions = {}
+        self._updated_at = {}
+        self._lock = threading.Lock()
+
+    def _write_locked(self, session_id, fields):
+        version = self._versions.get(session_id, 0) + 1
+        self._sessions.setdefault(session_id, {}).update(fields)
+        self._field_versions.setdefault(session_id, {}).update(dict.fromkeys(fields, version))
+        self._versions[session_id] = version
+        self._updated_at[session_id] = time.time()
+        return version
+
+    def save(self, session_id, fields):
+        with self._lock:
+            return self._write_locked(session_id, fields)
+
+    def append_log(self, session_id, entry, capacity):
+        """Number ``entry`` after the session's last log entry and keep it in the session's ring.
+
+        Returns (version, the entry it displaced from the ring or None).
+        """
+        with self._lock:
+            fields = self._sessions.get(session_id, {})
+            entry['seq'] = fields.get(LOG_SEQ_FIELD, 0) + 1
+            slot = f"{LOG_PREFIX}{entry['seq'] % capacity}"
+            evicted = fields.get(slot)
+            version = self._write_locked(session_id, {slot: entry, LOG_SEQ_FIELD: entry['seq']})
+            return version, evicted
+
+    def load(self, session_id, since=0):
+        """(version, fields) for a session, or None; only fields written after version ``since``."""
+        with self._lock:
+            fields = self._sessions.get(session_id)
+            if fields is None:
+                return None
+            written = self._field_versions[session_id]
+            return self._versions[session_id], {
+                name: value for name, value in fields.items() if written[name] > since
+            }
+
+    def version(self, session_id):
+        with self._lock:
+            return self._versions.get(session_id, 0)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._versions.pop(session_id, None)
+            self._field_versions.pop(session_id, None)
+            self._updated_at.pop(session_id, None)
+
+    def expire(self, max_age):
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [sid for sid, updated in self._updated_at.items() if updated < cutoff]
+        for session_id in stale:
+            self.delete(session_id)
+        return len(stale)
+
+
+class SQLiteSessionStore:
+    """Node-local store shared by every worker through one SQLite file in WAL mode.
+
+    Each session row carries a version that is bumped on every save, so a
+    worker can tell with a single indexed lookup whether its resident copy
+    of a session is stale. Each field row records the version it was last
+    written at, so catching up reads only the fields that changed.
+    """
+
+    shared = True
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_fields (
+                session_id TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (session_id, field)
+            );
+        """)
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(session_fields)')]
+        if 'version' not in columns:
+            # Files written before field versions existed; their rows count as written at version 0
+            conn.execute('ALTER TABLE session_fields ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+    def _connect(self):
+        # Connections must not cross a fork (preload_app) or be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _write(self, conn, session_id, fields):
+        """Bump the session's version and upsert ``fields`` at it, inside the caller's transaction."""
+        conn.execute(
+            'INSERT INTO sessions (session_id, version, updated_at) VALUES (?, 1, ?) '
+            'ON CONFLICT (session_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at',
+            (session_id, time.time())
+        )
+        version = conn.execute(
+            'SELECT version FROM sessions WHERE session_id = ?', (session_id,)
+        ).fetchone()[0]
+        conn.executemany(
+            'INSERT INTO session_fields (session_id, field, value, version) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (session_id, field) DO UPDATE SET value = excluded.value, version = excluded.version',
+            [(session_id, name, json.dumps(value), version) for name, value in fields.items()]
+        )
+        return version
+
+    def _field(self, conn, session_id, field):
+        row = conn.execute(
+            'SELECT value FROM session_fields WHERE session_id = ? AND field = ?', (session_id, field)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id, fields):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = self._write(conn, session_id, fields)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return version
+
+    def append_log(self, session_id, entry, capacity):
+        """Number ``entry`` after the session's last log entry, whichever worker wrote that one.
+
+        Returns (version, the entry it displaced from the ring or None).
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            entry['seq'] = (self._field(conn, session_id, LOG_SEQ_FIELD) or 0) + 1
+            slot = f"{LOG_PREFIX}{entry['seq'] % capacity}"
+            evicted = self._field(conn, session_id, slot)
+            version = self._write(conn, session_id, {slot: entry, LOG_SEQ_FIELD: entry['seq']})
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return version, evicted
+
+    def load(self, session_id, since=0):
+        """(version, fields) for a session, or None; only fields written after version ``since``.
+
+        Both come from one read transaction, so the version is exactly the
+        one the fields were read at.
+        """
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            row = conn.execute('SELECT version FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+            query = 'SELECT field, value FROM session_fields WHERE session_id = ?'
+            params = (session_id,)
+            if since:
+                query += ' AND version > ?'
+                params += (since,)
+            rows = conn.execute(query + ' ORDER BY rowid', params).fetchall()
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        return row[0], {name: json.loads(value) for name, value in rows}
+
+    def version(self, session_id):
+        row = self._connect().execute(
+            'SELECT version FROM sessions WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def delete(self, session_id):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM session_fields WHERE session_id = ?', (session_id,))
+            conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def expire(self, max_age):
+        conn = self._connect()
+        cutoff = time.time() - max_age
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'DELETE FROM session_fields WHERE session_id IN '
+                '(SELECT session_id FROM sessions WHERE updated_at < ?)',
+                (cutoff,)
+            )
+            removed = conn.execute('DELETE FROM sessions WHERE updated_at < ?', (cutoff,)).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return removed
+
+
+def create_session_store(backend='memory', path=None):
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(path)
+    raise ValueError(f"Unknown session store backend: {backend}")
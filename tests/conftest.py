@@ -0,0 +1,75 @@
+import importlib.util
+import itertools
+import os
+import sys
+import time
+
+import pytest
+from docx import Document
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_app_names = itertools.count()
+
+
+def build_docx(path, sections, paragraphs=2):
+    """A .docx with one 'Heading 1' per entry of ``sections``, each followed by ``paragraphs`` lines of text."""
+    doc = Document()
+    for name in sections:
+        doc.add_heading(name, level=1)
+        for i in range(paragraphs):
+            doc.add_paragraph(f"{name} finding {i} with supporting evidence and metrics.")
+    doc.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def load_app(tmp_path, monkeypatch):
+    """Import a fresh production_app configured from ``env``, with every file it writes under tmp_path.
+
+    Each call is a separate module instance, so two calls sharing a SQLite
+    path behave like two gunicorn workers on one node.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def load(**env):
+        settings = {
+            'SESSION_STORE_PATH': tmp_path / 'sessions.db',
+            'RATE_LIMIT_STORE_PATH': tmp_path / 'rate_limit.db',
+            'ACTIVITY_LOG_OVERFLOW_PATH': tmp_path / 'activity.log',
+            'STUB_ANALYSIS_DELAY': 0,
+        }
+        settings.update(env)
+        for key, value in settings.items():
+            monkeypatch.setenv(key, str(value))
+        name = f"production_app_{next(_app_names)}"
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, 'production_app.py'))
+        module = importlib.util.module_from_spec(spec)
+        # Flask finds templates through the module registered under the app's import name
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        return module
+
+    yield load
+
+
+@pytest.fixture
+def docx_path(tmp_path):
+    return build_docx(tmp_path / 'report.docx', ['Executive Summary', 'Background', 'Analysis', 'Recommendation'])
+
+
+@pytest.fixture
+def analyzed(load_app, docx_path):
+    """(app module, test client, session headers) for an uploaded report whose analysis has completed."""
+    app = load_app()
+    client = app.app.test_client()
+    with open(docx_path, 'rb') as f:
+        session_id = client.post('/api/upload', data={'file': (f, 'report.docx')}).json['session_id']
+    headers = {'X-Session-ID': session_id}
+    assert client.post('/api/start_analysis', headers=headers).json['success']
+    deadline = time.monotonic() + 10
+    while not client.get('/api/status', headers=headers).json['functionalities_enabled']:
+        assert time.monotonic() < deadline, "analysis did not complete"
+        time.sleep(0.02)
+    return app, client, headers
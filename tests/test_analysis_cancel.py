@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+
+def wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def start_analysis(app, docx_path):
+    client = app.app.test_client()
+    with open(docx_path, 'rb') as f:
+        session_id = client.post('/api/upload', data={'file': (f, 'report.docx')}).json['session_id']
+    assert client.post('/api/start_analysis').status_code == 200
+    return client, app.sessions.get(session_id)
+
+
+@pytest.mark.parametrize('engine', ['threads', 'asyncio'])
+def test_cancel_token_aborts_in_flight_sections(load_app, docx_path, engine):
+    app = load_app(ANALYSIS_ENGINE=engine, STUB_ANALYSIS_DELAY=5, SECTION_CONCURRENCY=1)
+    client, session = start_analysis(app, docx_path)
+    assert wait_for(lambda: session.analysis_status == 'running', 2)
+
+    # What the journal monitor does when the analysis was stopped through another worker
+    session.cancel_token.cancel("Analysis stopped on another worker")
+
+    # Well inside one status poll, and long before the 5 s provider call would have returned
+    assert wait_for(lambda: session.analysis_job.status in ('done', 'cancelled'), 1)
+    assert session.analysis_status == 'stopped'
+    assert client.get('/api/status').json['status'] == 'stopped'
+
+
+def test_asyncio_stop_before_first_section(load_app, docx_path):
+    app = load_app(ANALYSIS_ENGINE='asyncio', STUB_ANALYSIS_DELAY=5)
+    client, session = start_analysis(app, docx_path)
+    session.cancel_token.cancel("Analysis stopped on another worker")
+
+    assert wait_for(lambda: session.analysis_job.status in ('done', 'cancelled'), 1)
+    assert session.analysis_status == 'stopped'
@@ -0,0 +1,59 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from conftest import ROOT, build_docx
+
+
+def run_bulk(tmp_path, *args, delay=0):
+    env = dict(os.environ, STUB_ANALYSIS_DELAY=str(delay))
+    return subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'bulk_analyze.py'), str(tmp_path / 'docs'),
+         '--output', str(tmp_path / 'out.jsonl'), '--processes', '1', *args],
+        cwd=str(tmp_path), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+
+
+def records(tmp_path):
+    with open(tmp_path / 'out.jsonl', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def make_documents(tmp_path, count):
+    (tmp_path / 'docs').mkdir()
+    for i in range(count):
+        build_docx(tmp_path / 'docs' / f"report{i:02d}.docx", [f"Executive Summary {i}", f"Analysis {i}"])
+
+
+def test_bulk_run_skips_finished_documents(tmp_path):
+    make_documents(tmp_path, 3)
+    first = run_bulk(tmp_path)
+    assert first.wait(120) == 0, first.stderr.read()
+    assert [record['sections'] for record in records(tmp_path)] == [2, 2, 2]
+    # Importing the pipeline must not leave the web app's upload folder behind
+    assert not (tmp_path / 'uploads').exists()
+
+    again = run_bulk(tmp_path)
+    assert again.wait(120) == 0
+    assert '3 already analyzed, 0 to go' in again.stdout.read()
+    assert len(records(tmp_path)) == 3
+
+
+def test_interrupted_run_exits_nonzero_and_resumes(tmp_path):
+    make_documents(tmp_path, 20)
+    interrupted = run_bulk(tmp_path, '--documents', '2', delay=0.5)
+    time.sleep(3)
+    interrupted.send_signal(signal.SIGINT)
+    assert interrupted.wait(60) == 1
+    assert 'Interrupted' in interrupted.stderr.read()
+    done = records(tmp_path)
+    assert 0 < len(done) < 20
+
+    resumed = run_bulk(tmp_path)
+    assert resumed.wait(120) == 0
+    assert sorted(record['document'] for record in records(tmp_path)) == sorted(
+        str(tmp_path / 'docs' / f"report{i:02d}.docx") for i in range(20)
+    )
@@ -0,0 +1,37 @@
+def first_feedback_id(client, headers, section_name):
+    return client.get(f'/api/section/{section_name}', headers=headers).json['analysis']['feedback_items'][0]['id']
+
+
+def test_section_revalidates_until_a_decision_changes_it(analyzed):
+    _app, client, headers = analyzed
+    response = client.get('/api/section/Executive Summary', headers=headers)
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and response.headers['Cache-Control'] == 'private, no-cache'
+
+    revalidated = client.get('/api/section/Executive Summary', headers={**headers, 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    # A weak validator, as sent back after a compressed response, matches too
+    weak = client.get('/api/section/Executive Summary', headers={**headers, 'If-None-Match': f'W/{etag}'})
+    assert weak.status_code == 304
+
+    feedback_id = first_feedback_id(client, headers, 'Executive Summary')
+    assert client.post('/api/feedback/accept', headers=headers, json={'feedback_id': feedback_id}).json['success']
+    changed = client.get('/api/section/Executive Summary', headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.json['accepted_feedback'] == [feedback_id]
+
+
+def test_sections_list_etag_covers_every_section(analyzed):
+    _app, client, headers = analyzed
+    etag = client.get('/api/sections', headers=headers).headers['ETag']
+    other_etag = client.get('/api/section/Background', headers=headers).headers['ETag']
+    assert client.get('/api/sections', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    # A decision in one section changes the list's ETag but not the other sections'
+    feedback_id = first_feedback_id(client, headers, 'Analysis')
+    assert client.post('/api/feedback/reject', headers=headers, json={'feedback_id': feedback_id}).json['success']
+    assert client.get('/api/sections', headers={**headers, 'If-None-Match': etag}).status_code == 200
+    assert client.get('/api/section/Background', headers={**headers, 'If-None-Match': other_etag}).status_code == 304
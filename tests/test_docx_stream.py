@@ -0,0 +1,76 @@
+import io
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from analysis_pipeline import extract_document_sections_from_docx
+from docx_stream import extract_document_sections_streaming, extract_document_text
+from heading_detector import HeadingDetector
+
+
+def build_mixed_document(path):
+    """Every way this tool recognises a heading, plus the body content python-docx skips or flattens."""
+    doc = Document()
+    doc.add_paragraph("Preamble before any heading.")
+    doc.add_heading("Background", level=1)
+    para = doc.add_paragraph("Plain run, ")
+    para.add_run("italic run").italic = True
+    para.add_run("\tafter a tab")
+    para.add_run().add_break()
+    para.add_run("after a break")
+    doc.add_paragraph("")
+    doc.add_paragraph("   ")
+
+    # Bold keyword fallback, bold only in a later run, trailing colon stripped
+    heading = doc.add_paragraph("2. ")
+    heading.add_run("Analysis:").bold = True
+    doc.add_paragraph("Bold but not a heading because it has no keyword").runs[0].bold = True
+    explicit_off = doc.add_paragraph()
+    explicit_off.add_run("Conclusion drawn mid-paragraph").bold = False
+    doc.add_paragraph("Analysis in a long paragraph that runs well beyond the hundred character limit for headings, "
+                      "so it stays body text even though it mentions a keyword.").runs[0].bold = True
+
+    # A custom style inheriting Heading 2's outline level
+    custom = doc.styles.add_style('Findings Title', WD_STYLE_TYPE.PARAGRAPH)
+    custom.base_style = doc.styles['Heading 2']
+    doc.add_paragraph("Key Findings", style='Findings Title')
+    doc.add_paragraph("Findings body.")
+
+    # Outline level set directly on the paragraph
+    direct = doc.add_paragraph("Appendix A")
+    ppr = direct._p.get_or_add_pPr()
+    level = OxmlElement('w:outlineLvl')
+    level.set(qn('w:val'), '0')
+    ppr.append(level)
+    doc.add_paragraph("Appendix body.")
+
+    # Table cells are not body paragraphs
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Recommendation"
+    table.cell(0, 1).text = "cell text"
+
+    # A repeated heading keeps its first position and its last content
+    doc.add_heading("Background", level=1)
+    doc.add_paragraph("Second background body.")
+    doc.save(str(path))
+    return str(path)
+
+
+def test_streaming_matches_python_docx(tmp_path):
+    path = build_mixed_document(tmp_path / 'mixed.docx')
+    expected = extract_document_sections_from_docx(Document(path), HeadingDetector())
+
+    assert extract_document_sections_streaming(path) == expected
+    assert list(extract_document_sections_streaming(path)) == list(expected)
+    with open(path, 'rb') as f:
+        assert extract_document_sections_streaming(io.BytesIO(f.read())) == expected
+    assert list(expected) == ['Executive Summary', 'Background', '2. Analysis', 'Key Findings', 'Appendix A']
+    assert expected['Background'] == 'Second background body.'
+
+
+def test_streaming_text_matches_python_docx(tmp_path):
+    path = build_mixed_document(tmp_path / 'mixed.docx')
+    expected = '\n'.join(para.text for para in Document(path).paragraphs if para.text.strip())
+    assert extract_document_text(path) == expected
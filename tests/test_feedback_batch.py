@@ -0,0 +1,46 @@
+def feedback_ids(client, headers, section_name):
+    items = client.get(f'/api/section/{section_name}', headers=headers).json['analysis']['feedback_items']
+    return [item['id'] for item in items]
+
+
+def test_unknown_id_rejects_the_whole_batch(analyzed):
+    app, client, headers = analyzed
+    ids = feedback_ids(client, headers, 'Executive Summary')
+    before = client.get('/api/sections', headers=headers).json
+    log_cursor = client.get('/api/status', headers=headers).json['log_cursor']
+
+    response = client.post('/api/feedback/batch', headers=headers, json={
+        'operations': [{'feedback_id': ids[0], 'decision': 'accepted'},
+                       {'feedback_id': 'ai_missing', 'decision': 'rejected'}],
+        'select': {'section': 'Analysis', 'decision': 'rejected'}
+    })
+    assert response.status_code == 400
+    assert response.json['unknown_ids'] == ['ai_missing']
+
+    # Neither the valid operation nor the selector was applied, and nothing was logged
+    assert client.get('/api/sections', headers=headers).json == before
+    assert app.sessions.get(headers['X-Session-ID']).decisions == {}
+    status = client.get('/api/status', headers=headers).json
+    assert status['log_cursor'] == log_cursor
+    assert status['statistics']['accepted_feedback'] == status['statistics']['rejected_feedback'] == 0
+
+
+def test_batch_applies_selectors_then_operations(analyzed):
+    _app, client, headers = analyzed
+    summary_ids = feedback_ids(client, headers, 'Executive Summary')
+    analysis_ids = feedback_ids(client, headers, 'Analysis')
+
+    response = client.post('/api/feedback/batch', headers=headers, json={
+        'select': {'section': 'Executive Summary', 'decision': 'accepted'},
+        'operations': [{'feedback_id': summary_ids[0], 'decision': 'rejected'},
+                       {'feedback_id': analysis_ids[0], 'decision': 'accepted'}]
+    })
+    assert response.status_code == 200
+    assert response.json['applied'] == len(summary_ids) + 2
+    assert set(response.json['sections']) == {'Executive Summary', 'Analysis'}
+
+    summary = client.get('/api/section/Executive Summary', headers=headers).json
+    # The explicit operation ran after the selector, so it wins
+    assert summary['rejected_feedback'] == [summary_ids[0]]
+    assert summary['accepted_feedback'] == summary_ids[1:]
+    assert response.json['statistics']['accepted_feedback'] == len(summary_ids)
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from job_journal import MemoryJobJournal, SQLiteJobJournal
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def journal(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryJobJournal()
+    return SQLiteJobJournal(str(tmp_path / 'journal.db'))
+
+
+def test_only_silent_running_jobs_are_claimed(journal):
+    journal.start('live', 's1', 'worker-a')
+    journal.start('dead', 's2', 'worker-a')
+    journal.start('done', 's3', 'worker-a')
+    journal.checkpoint('dead', 'Background')
+    assert journal.finish('done', 'completed')
+
+    # Everyone has heartbeated recently
+    assert journal.claim_orphans('worker-b', orphan_timeout=30) == []
+
+    journal.release('worker-a', 'dead')
+    assert [tuple(job) for job in journal.claim_orphans('worker-b', orphan_timeout=30)] == [('dead', 's2')]
+    # Claiming heartbeats the job for its new owner, so nobody else takes it
+    assert journal.claim_orphans('worker-c', orphan_timeout=30) == []
+    assert journal.completed_sections('dead') == {'Background'}
+
+    # A finish recorded first wins over one arriving later
+    assert journal.finish('dead', 'stopped')
+    assert not journal.finish('dead', 'completed')
+    assert not journal.running('dead') and journal.running('live')
+
+
+def test_resumed_analysis_skips_checkpointed_sections(load_app, tmp_path, docx_path):
+    shared = {'SESSION_STORE': 'sqlite', 'SESSION_STORE_PATH': tmp_path / 'shared.db', 'JOB_HEARTBEAT_INTERVAL': 3600}
+    dead_worker = load_app(**shared)
+    survivor = load_app(**shared)
+
+    with open(docx_path, 'rb') as f:
+        session_id = dead_worker.app.test_client().post(
+            '/api/upload', data={'file': (f, 'report.docx')}).json['session_id']
+
+    # The dead worker got through two of four sections before it went away
+    session = dead_worker.sessions.get(session_id)
+    session.analysis_id = 'analysis_interrupted'
+    session.analysis_status = 'running'
+    session.persist('analysis_id', 'analysis_status')
+    dead_worker.job_journal.start(session.analysis_id, session_id, 'dead-host:1')
+    planned = dead_worker.plan_analysis(session)
+    for completed, (section_name, result) in enumerate(dead_worker.pipeline.analyze_sections_cached(planned[:2]), 1):
+        dead_worker.record_section_result(session, section_name, result, completed, len(planned))
+    dead_worker.job_journal.release('dead-host:1')
+
+    analyzed = []
+    analyze_sections_cached = survivor.pipeline.analyze_sections_cached
+
+    def recording_analyze(batch, cancel_token=None):
+        analyzed.extend(section_name for section_name, _content, _guidelines in batch)
+        return analyze_sections_cached(batch, cancel_token)
+
+    survivor.pipeline.analyze_sections_cached = recording_analyze
+    survivor.journal_monitor.tick()
+
+    resumed = survivor.sessions.get(session_id)
+    deadline = time.monotonic() + 10
+    while resumed.analysis_status != 'completed':
+        assert time.monotonic() < deadline, resumed.analysis_status
+        time.sleep(0.02)
+
+    assert analyzed == ['Analysis', 'Recommendation']
+    assert set(resumed.analysis_results) == {'Executive Summary', 'Background', 'Analysis', 'Recommendation'}
+    assert survivor.journal_monitor.stats()['resumed_here'] == 1
+    assert not survivor.job_journal.running('analysis_interrupted')
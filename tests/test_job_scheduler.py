@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from conftest import build_docx
+from job_scheduler import JobScheduler, QueueFull
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_full_queue_raises_with_retry_after():
+    scheduler = JobScheduler(workers=1, max_queue=1)
+    release = threading.Event()
+    running = scheduler.submit('a', release.wait)
+    wait_for(lambda: running.status == 'running')
+    queued = scheduler.submit('b', lambda: None)
+
+    with pytest.raises(QueueFull) as excinfo:
+        scheduler.submit('c', lambda: None)
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats()['rejected'] == 1
+
+    # Cancelling the queued job frees its slot
+    assert scheduler.cancel(queued)
+    scheduler.submit('c', lambda: None)
+    release.set()
+
+
+def test_sessions_are_served_round_robin():
+    scheduler = JobScheduler(workers=1, max_queue=8)
+    release = threading.Event()
+    order = []
+    blocker = scheduler.submit('blocker', release.wait)
+    wait_for(lambda: blocker.status == 'running')
+    jobs = [scheduler.submit(key, order.append, f"{key}{i}") for key, i in (('a', 1), ('a', 2), ('a', 3), ('b', 1))]
+    assert [scheduler.position(job) for job in jobs] == [1, 3, 4, 2]
+    release.set()
+    wait_for(lambda: all(job.status == 'done' for job in jobs))
+    assert order == ['a1', 'b1', 'a2', 'a3']
+
+
+def test_start_analysis_returns_429_when_the_queue_is_full(load_app, tmp_path):
+    app = load_app(ANALYSIS_WORKERS=1, ANALYSIS_QUEUE_SIZE=1, STUB_ANALYSIS_DELAY=0.5)
+    client = app.app.test_client()
+    session_ids = []
+    for name in ('a', 'b', 'c'):
+        path = build_docx(tmp_path / f"{name}.docx", [f"Summary {name}", f"Findings {name}"])
+        with open(path, 'rb') as f:
+            session_ids.append(client.post('/api/upload', data={'file': (f, f"{name}.docx")}).json['session_id'])
+    running, queued, rejected = ({'X-Session-ID': session_id} for session_id in session_ids)
+
+    assert client.post('/api/start_analysis', headers=running).status_code == 200
+    wait_for(lambda: app.sessions.get(session_ids[0]).analysis_status == 'running')
+    assert client.post('/api/start_analysis', headers=queued).status_code == 200
+
+    response = client.post('/api/start_analysis', headers=rejected)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == response.json['retry_after'] >= 1
+    # The rejected session is left as it was, free to try again
+    assert client.get('/api/status', headers=rejected).json['status'] == 'idle'
+
+    for headers in (queued, running):
+        client.post('/api/stop_analysis', headers=headers)
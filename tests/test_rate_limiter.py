@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+from rate_limiter import MemoryBuckets, RateLimiter, SQLiteBuckets
+
+
+def test_oversized_call_is_charged_in_full(tmp_path):
+    for buckets in (MemoryBuckets(), SQLiteBuckets(str(tmp_path / 'rate_limit.db'))):
+        limiter = RateLimiter(tokens_per_second=1000, buckets=buckets, analysis_reserve=0.2, poll_interval=0.01)
+        # One and a half bursts' worth goes out at once against a full bucket...
+        assert limiter.acquire('analysis', 1500) < 0.05
+        # ...and leaves 500 tokens of debt that even chat waits out
+        start = time.monotonic()
+        limiter.acquire('chat', 1)
+        assert time.monotonic() - start >= 0.45
+
+
+class SlowBuckets(MemoryBuckets):
+    """Buckets whose take stands in for a SQLite transaction stuck behind another worker's write lock."""
+
+    def __init__(self, limiter_ref):
+        super().__init__()
+        self.limiter_ref = limiter_ref
+        self.cond_free_during_take = []
+
+    def take(self, limits, amounts, reserve, now):
+        cond = self.limiter_ref[0]._cond
+        free = []
+
+        def probe():
+            # From another thread: the condition's RLock would let this one straight back in
+            if cond.acquire(timeout=0.2):
+                cond.release()
+                free.append(True)
+
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        self.cond_free_during_take.append(bool(free))
+        return super().take(limits, amounts, reserve, now)
+
+
+def test_take_runs_outside_the_lane_lock():
+    limiter_ref = []
+    buckets = SlowBuckets(limiter_ref)
+    limiter = RateLimiter(requests_per_second=100, buckets=buckets)
+    limiter_ref.append(limiter)
+    limiter.acquire('chat')
+    asyncio.run(limiter.acquire_async('analysis'))
+    assert buckets.cond_free_during_take == [True, True]
+
+
+def test_chat_goes_ahead_of_waiting_analysis():
+    # No reserve, so only lane priority decides who is served next
+    limiter = RateLimiter(tokens_per_second=8, analysis_reserve=0, poll_interval=0.01)
+    limiter.acquire('chat', 8)
+    order = []
+
+    def call(lane, tokens):
+        limiter.acquire(lane, tokens)
+        order.append(lane)
+
+    analysis = threading.Thread(target=call, args=('analysis', 1))
+    analysis.start()
+    time.sleep(0.05)
+    chat = threading.Thread(target=call, args=('chat', 4))
+    chat.start()
+    analysis.join()
+    chat.join()
+    # Analysis waited first and could have gone after 1/8s; it held back until chat's 4 tokens were paid
+    assert order == ['chat', 'analysis']
+    assert limiter.stats()['lanes']['analysis']['waiting'] == 0
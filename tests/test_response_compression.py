@@ -0,0 +1,60 @@
+import gzip
+import zlib
+
+import pytest
+
+from response_compression import negotiate_encoding
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('deflate', 'deflate'),
+    ('deflate, gzip', 'gzip'),
+    ('gzip;q=0.5, deflate', 'deflate'),
+    ('gzip;q=0, deflate;q=0', None),
+    ('*', 'gzip'),
+    ('*;q=0.5, gzip;q=0', 'deflate'),
+    ('GZIP;q=bogus, deflate;q=0.1', 'deflate'),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_section_view_is_compressed_when_accepted(analyzed):
+    app, client, headers = analyzed
+    plain = client.get('/api/section/Executive Summary', headers=headers)
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.data) >= app.app.config['COMPRESSION_MIN_SIZE']
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    gzipped = client.get('/api/section/Executive Summary', headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gzipped.data) == plain.data
+    # Encoded bytes differ from the identity body, so only a weak validator is honest
+    assert gzipped.headers['ETag'] == f'W/{plain.headers["ETag"]}'
+
+    deflated = client.get('/api/section/Executive Summary', headers={**headers, 'Accept-Encoding': 'gzip;q=0, deflate'})
+    assert deflated.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(deflated.data) == plain.data
+
+
+def test_completed_views_reuse_their_compressed_body(analyzed):
+    app, client, headers = analyzed
+    gzip_headers = {**headers, 'Accept-Encoding': 'gzip'}
+    first = client.get('/api/section/Executive Summary', headers=gzip_headers)
+    hits = app.compressed_responses.stats()['hits']
+    second = client.get('/api/section/Executive Summary', headers=gzip_headers)
+    assert second.data == first.data
+    assert app.compressed_responses.stats()['hits'] == hits + 1
+
+
+def test_small_and_error_responses_are_left_alone(analyzed):
+    app, client, headers = analyzed
+    missing = client.get('/api/section/Nowhere', headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert missing.status_code == 404 and 'Content-Encoding' not in missing.headers
+    # A fresh client has no session: an empty section list, well under the size worth compressing
+    small = app.app.test_client().get('/api/sections', headers={'Accept-Encoding': 'gzip'})
+    assert small.json == {'sections': []} and 'Content-Encoding' not in small.headers
@@ -0,0 +1,61 @@
+import time
+
+from session_registry import SessionRegistry
+
+
+class FakeSession:
+    def __init__(self, session_id, pinned=False):
+        self.session_id = session_id
+        self.pinned = pinned
+
+
+def make_registry(**options):
+    evicted = []
+    registry = SessionRegistry(is_pinned=lambda session: session.pinned, on_evict=evicted.append, **options)
+    return registry, evicted
+
+
+def test_least_recently_used_session_is_evicted():
+    registry, evicted = make_registry(max_sessions=2, idle_ttl=0)
+    a, b, c = FakeSession('a'), FakeSession('b'), FakeSession('c')
+    registry.add(a)
+    registry.add(b)
+    # Touching 'a' makes 'b' the least recently used
+    assert registry.get('a') is a
+    registry.add(c)
+    assert evicted == [b]
+    assert 'b' not in registry and 'a' in registry and 'c' in registry
+    assert len(registry) == 2
+
+
+def test_pinned_sessions_survive_eviction():
+    registry, evicted = make_registry(max_sessions=1, idle_ttl=0)
+    running = FakeSession('running', pinned=True)
+    registry.add(running)
+    registry.add(FakeSession('b'))
+    assert evicted == []
+    assert len(registry) == 2
+
+    running.pinned = False
+    registry.add(FakeSession('c'))
+    assert [session.session_id for session in evicted] == ['running', 'b']
+    assert len(registry) == 1
+
+
+def test_idle_sessions_expire_on_next_access():
+    registry, evicted = make_registry(max_sessions=10, idle_ttl=0.05)
+    idle, pinned = FakeSession('idle'), FakeSession('pinned', pinned=True)
+    registry.add(idle)
+    registry.add(pinned)
+    time.sleep(0.1)
+    assert registry.get('idle') is None
+    assert evicted == [idle]
+    assert registry.get('pinned') is pinned
+
+
+def test_remove_notifies_once():
+    registry, evicted = make_registry()
+    session = registry.add(FakeSession('a'))
+    assert registry.remove('a') is session
+    assert registry.remove('a') is None
+    assert evicted == [session]
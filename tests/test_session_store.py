@@ -0,0 +1,35 @@
+import pytest
+
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+
+
+def test_load_since_returns_only_newer_fields(store):
+    assert store.load('s1') is None
+    assert store.save('s1', {'document_name': 'a.docx', 'analysis_status': 'idle'}) == 1
+    assert store.save('s1', {'analysis_status': 'running'}) == 2
+    version, _evicted = store.append_log('s1', {'message': 'hello'}, capacity=4)
+    assert version == 3
+
+    assert store.load('s1') == (3, {
+        'document_name': 'a.docx', 'analysis_status': 'running',
+        'log:1': {'message': 'hello', 'seq': 1}, 'log_seq': 1
+    })
+    assert store.load('s1', since=1) == (3, {
+        'analysis_status': 'running', 'log:1': {'message': 'hello', 'seq': 1}, 'log_seq': 1
+    })
+    assert store.load('s1', since=3) == (3, {})
+
+
+def test_log_ring_evicts_oldest(store):
+    for i in range(6):
+        _version, evicted = store.append_log('s1', {'message': f"entry {i}"}, capacity=4)
+    assert evicted == {'message': 'entry 1', 'seq': 2}
+    _version, fields = store.load('s1')
+    assert sorted(entry['seq'] for name, entry in fields.items() if name.startswith('log:')) == [3, 4, 5, 6]
@@ -0,0 +1,41 @@
+def test_worker_catches_up_with_only_changed_fields(load_app, tmp_path, docx_path):
+    store_path = tmp_path / 'shared.db'
+    worker_a = load_app(SESSION_STORE='sqlite', SESSION_STORE_PATH=store_path)
+    worker_b = load_app(SESSION_STORE='sqlite', SESSION_STORE_PATH=store_path)
+
+    client_a = worker_a.app.test_client()
+    with open(docx_path, 'rb') as f:
+        session_id = client_a.post('/api/upload', data={'file': (f, 'report.docx')}).json['session_id']
+    headers = {'X-Session-ID': session_id}
+    assert worker_b.app.test_client().get('/api/status', headers=headers).json['session_info']['document_name'] == 'report.docx'
+    on_b = worker_b.sessions.get(session_id)
+
+    session_a = worker_a.sessions.get(session_id)
+    session_a.analysis_status = 'queued'
+    session_a.persist('analysis_status')
+
+    loads = []
+    original_load = worker_b.session_store.load
+
+    def recording_load(session_id, since=0):
+        loaded = original_load(session_id, since)
+        loads.append(set(loaded[1]))
+        return loaded
+
+    worker_b.session_store.load = recording_load
+    worker_b.sync_session(on_b)
+    assert on_b.analysis_status == 'queued'
+    assert loads == [{'analysis_status'}]
+
+    # Already current: no load at all
+    worker_b.sync_session(on_b)
+    assert len(loads) == 1
+
+
+def test_older_snapshot_is_not_applied(load_app):
+    app = load_app()
+    session = app.AnalysisSession(store=app.session_store)
+    session.apply_state({'analysis_status': 'completed'}, 5)
+    session.apply_state({'analysis_status': 'running'}, 4)
+    assert session.analysis_status == 'completed'
+    assert session.store_version == 5
@@ -0,0 +1,85 @@
+"""
+Upload Store for Enhanced Writeup Automation AI Tool
+Single-pass upload ingestion into content-addressed storage
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class StoredUpload:
+    def __init__(self, sha256, path, size, buffer, deduplicated):
+        self.sha256 = sha256
+        self.path = path
+        self.size = size
+        self.buffer = buffer
+        self.deduplicated = deduplicated
+
+    def close(self):
+        self.buffer.close()
+
+
+def ingest_upload(stream, folder, suffix='.docx'):
+    """Read an upload stream once, hashing and spooling it as it arrives.
+
+    The blob is stored at ``<folder>/<sha256><suffix>``, so identical uploads
+    share one file and different uploads with the same name never collide.
+    The returned ``buffer`` is rewound and can be parsed directly without
+    reopening the stored file.
+    """
+    digest = hashlib.sha256()
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    size = 0
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+        buffer.write(chunk)
+        size += len(chunk)
+
+    sha256 = digest.hexdigest()
+    path = os.path.join(folder, f"{sha256}{suffix}")
+    deduplicated = os.path.exists(path)
+    if not deduplicated:
+        buffer.seek(0)
+        # Write then rename so a concurrent identical upload never sees a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(buffer, f, CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            buffer.close()
+            raise
+
+    buffer.seek(0)
+    return StoredUpload(sha256, path, size, buffer, deduplicated)
+
+
+class ParseCache:
+    """Small LRU of parse results keyed by content hash, so a blob is parsed once per process."""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_parse(self, key, parse):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key], True
+        value = parse()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value, False